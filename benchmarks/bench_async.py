@@ -0,0 +1,64 @@
+"""Fire many concurrent :meth:`pyradigms.Pyradigm.acompose_paradigm` requests from
+one event loop and report the throughput for executors of growing size::
+
+    python benchmarks/bench_async.py --requests 32 --sizes 1 2 4 8
+
+Every request composes the paradigms for a different set of lexemes. With
+``--identical``, all requests are the same and share one computation.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from pyradigms import Pyradigm
+
+
+sys.path.insert(0, str(Path(__file__).parent))
+from synthetic import make_lexicon  # noqa: E402 pylint: disable=wrong-import-position
+
+
+async def fire(pyd, requests, executor, identical):
+    lexemes = sorted(set(pyd.entries["Lexeme"]))
+    per_request = max(1, len(lexemes) // 4)
+    calls = []
+    for i in range(requests):
+        start = 0 if identical else (i * per_request) % len(lexemes)
+        calls.append(
+            pyd.acompose_paradigm(
+                executor=executor,
+                filters={"Lexeme": lexemes[start : start + per_request]},
+            )
+        )
+    start = time.perf_counter()
+    await asyncio.gather(*calls)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lexemes", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--processes", action="store_true", help="use processes")
+    parser.add_argument("--identical", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("pyradigms").setLevel(logging.WARNING)
+    entries = make_lexicon(args.lexemes).drop(columns=["ID"])
+    pyd = Pyradigm(entries, x=["P0", "P1"], y=["P2", "P3"], z="Lexeme")
+    pool = ProcessPoolExecutor if args.processes else ThreadPoolExecutor
+    for size in args.sizes:
+        with pool(max_workers=size) as executor:
+            seconds = asyncio.run(fire(pyd, args.requests, executor, args.identical))
+        print(
+            f"{pool.__name__} ({size:>2} workers): {args.requests} requests in"
+            f" {seconds:7.3f}s, {args.requests / seconds:7.2f} requests/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
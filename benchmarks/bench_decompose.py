@@ -0,0 +1,31 @@
+"""Time :meth:`pyradigms.Pyradigm.decompose_paradigm` on synthetic paradigms of
+growing size. The time per cell should stay roughly constant."""
+import time
+import pandas as pd
+from pyradigms import Pyradigm
+
+
+def make_paradigm(n_rows, n_cols):
+    columns = [f"{p}{n}" for n in range(n_cols // 3 + 1) for p in "123"][:n_cols]
+    index = [f"T{i}.M{i % 3}" for i in range(n_rows)]
+    data = [[f"form{i}_{j}" for j in range(n_cols)] for i in range(n_rows)]
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+def main():
+    pyd = Pyradigm()
+    for n_rows in [10, 100, 1000, 10000]:
+        paradigm = make_paradigm(n_rows, 30)
+        start = time.perf_counter()
+        entries = pyd.decompose_paradigm(
+            paradigm, x=["Person", "Number"], y=["Tense", "Mood"]
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            f"{len(entries):>8} cells: {elapsed:8.4f}s"
+            f" ({elapsed / len(entries) * 1e6:6.2f}µs/cell)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Time the main conversions on synthetic lexicons of growing size and record their
+peak memory use (as seen by ``tracemalloc``). Results are written to a JSON file, so
+that runs for different versions can be compared::
+
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --sizes 10 100 --params 5 --sparsity 0.3
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+import pyradigms
+from pyradigms import Pyradigm
+
+
+sys.path.insert(0, str(Path(__file__).parent))
+# pylint: disable=wrong-import-position
+from synthetic import make_lexicon, parameter_values  # noqa: E402
+
+
+def make_stages(entries, n_params, n_values):
+    """Returns a list of ``(name, setup, run)`` tuples. Only ``run(setup())`` is
+    measured."""
+    params = list(parameter_values(n_params, n_values))
+    kwargs = {
+        "x": params[: n_params // 2],
+        "y": params[n_params // 2 :],
+        "z": "Lexeme",
+    }
+    sort_orders = parameter_values(n_params, n_values)
+    wide = entries.drop(columns=["ID"])
+    long = Pyradigm(entries.copy()).to_long()
+
+    def compose(df):
+        pyd = Pyradigm(df, sort_orders=dict(sort_orders), **kwargs)
+        return dict(pyd.iter_paradigms())
+
+    def decompose(paradigms):
+        pyd = Pyradigm()
+        return pd.concat(
+            [
+                pyd.decompose_paradigm(paradigm, z_value=z_key, **kwargs)
+                for z_key, paradigm in paradigms.items()
+            ]
+        )
+
+    def to_long(df):
+        return Pyradigm(df).to_long()
+
+    def from_long(df):
+        return Pyradigm.from_dataframe(df, data_format="long")
+
+    def roundtrip(df):
+        # long to wide, wide to paradigms, paradigms to wide, wide to long
+        pyd = from_long(df)
+        wide_entries = decompose(compose(pyd.entries))
+        return to_long(wide_entries)
+
+    paradigms = compose(wide)
+    return [
+        ("compose_paradigm", wide.copy, compose),
+        ("decompose_paradigm", lambda: paradigms, decompose),
+        ("to_long", wide.copy, to_long),
+        ("from_dataframe_long", lambda: long, from_long),
+        ("roundtrip", lambda: long, roundtrip),
+    ]
+
+
+def measure(setup, run, repeat):
+    """Best time of ``repeat`` runs, and the peak memory of a separate run."""
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        run(arg)
+        times.append(time.perf_counter() - start)
+    arg = setup()
+    tracemalloc.start()
+    try:
+        run(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 100, 1000], help="lexemes"
+    )
+    parser.add_argument("--params", type=int, default=4)
+    parser.add_argument("--values", type=int, default=3)
+    parser.add_argument("--sparsity", type=float, default=0.1)
+    parser.add_argument("--syncretism", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+
+    # progress messages would be timed as well
+    logging.getLogger("pyradigms").setLevel(logging.WARNING)
+    results = []
+    for n_lexemes in args.sizes:
+        entries = make_lexicon(
+            n_lexemes, args.params, args.values, args.sparsity, args.syncretism
+        )
+        # pyradigms reports progress on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            stages = make_stages(entries, args.params, args.values)
+        for name, setup, run in stages:
+            with contextlib.redirect_stdout(io.StringIO()):
+                seconds, peak = measure(setup, run, args.repeat)
+            results.append(
+                {
+                    "stage": name,
+                    "lexemes": n_lexemes,
+                    "entries": len(entries),
+                    "seconds": seconds,
+                    "peak_bytes": peak,
+                }
+            )
+            print(
+                f"{name:>20} {n_lexemes:>7} lexemes {len(entries):>9} entries:"
+                f" {seconds:9.4f}s {peak / 2**20:9.1f} MiB"
+            )
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "pyradigms": pyradigms.__version__,
+        "pandas": pd.__version__,
+        "python": platform.python_version(),
+        "parameters": vars(args),
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Synthetic lexicons for benchmarking. Every lexeme has a form for (almost) every
+combination of parameter values; some cells are left empty (``sparsity``), and some
+share the form of another cell of the same lexeme (``syncretism``)."""
+import itertools
+import numpy as np
+import pandas as pd
+
+
+def parameter_names(n_params):
+    return [f"P{i}" for i in range(n_params)]
+
+
+def parameter_values(n_params, n_values):
+    """Values are named after their parameter (``P0a``, ``P0b``…), so they cannot be
+    mistaken for person values."""
+    return {
+        param: [f"{param}{chr(97 + j)}" for j in range(n_values)]
+        for param in parameter_names(n_params)
+    }
+
+
+def make_lexicon(  # pylint: disable=too-many-arguments
+    n_lexemes=100, n_params=4, n_values=3, sparsity=0.1, syncretism=0.2, seed=0
+):
+    """Generate entries in wide format.
+
+    Args:
+        n_lexemes (int): number of lexemes (the z axis)
+        n_params (int): number of parameters besides ``Lexeme``
+        n_values (int): number of values per parameter
+        sparsity (float): share of cells without a form
+        syncretism (float): share of cells with the form of another cell
+        seed (int): seed for the random number generator
+
+    Returns:
+        a DataFrame with the columns ``ID``, ``Lexeme``, the parameters and ``Form``
+    """
+    rng = np.random.default_rng(seed)
+    values = parameter_values(n_params, n_values)
+    cells = np.array(list(itertools.product(*values.values())), dtype=object)
+    n_cells = len(cells)
+
+    lexemes = np.repeat(np.arange(n_lexemes), n_cells)
+    cell_ids = np.tile(np.arange(n_cells), n_lexemes)
+    # syncretic cells point to another cell of the same lexeme
+    form_ids = np.where(
+        rng.random(len(cell_ids)) < syncretism,
+        rng.integers(0, n_cells, len(cell_ids)),
+        cell_ids,
+    )
+    keep = rng.random(len(cell_ids)) >= sparsity
+
+    lexeme_names = np.array([f"lex{i}" for i in range(n_lexemes)], dtype=object)
+    data = {"ID": [f"e{i}" for i in range(keep.sum())]}
+    data["Lexeme"] = lexeme_names[lexemes[keep]]
+    for i, param in enumerate(values):
+        data[param] = cells[cell_ids[keep], i]
+    data["Form"] = [
+        f"{lexeme}-{form}"
+        for lexeme, form in zip(data["Lexeme"], form_ids[keep].astype(str))
+    ]
+    return pd.DataFrame(data)
@@ -1,7 +1,29 @@
 """This is the main pyradigms module"""
+import asyncio
+import glob
+import gzip
+import hashlib
+import json
 import logging
+import os
+import pickle
 import re
+import shutil
 import sys
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections import deque
+from collections import namedtuple
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import lru_cache
+from functools import partial
 from io import StringIO
 from pathlib import Path
 from typing import Dict
@@ -11,8 +33,7 @@ import numpy as np
 import pandas as pd
 from attrs import Factory
 from attrs import define
-
-import itertools
+from attrs import field
 
 __author__ = "Florian Matter"
 __email__ = "florianmatter@gmail.com"
@@ -32,11 +53,59 @@ log.setLevel(logging.INFO)
 person_values = ["1", "2", "3", "1+3", "1+2"]
 
 
-def _format_person_values(string, sep):
-    for val in person_values:
-        if val in string:
-            string = string.replace(val + sep, val)
-    return string
+_END = object()
+
+
+_Done = namedtuple("_Done", ["value"])
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+StageStats = namedtuple("StageStats", ["stage", "z_key", "seconds", "rows", "nbytes"])
+
+
+class _Lazy:  # pylint: disable=too-few-public-methods
+    """Defers building a log message argument until the message is emitted."""
+
+    def __init__(self, func):
+        self.func = func
+
+    def __str__(self):
+        return str(self.func())
+
+
+def _frame_repr(df):
+    return df.head().to_string() + f"\n({len(df)} entries)"
+
+
+class _StageTimer:
+    """Measures the time since the previous stage ended. Does nothing unless
+    ``enabled``."""
+
+    def __init__(self, enabled, z_key=None):
+        self.records = [] if enabled else None
+        self.z_key = z_key
+        self.start = time.perf_counter()
+
+    def lap(self, stage, frame):
+        if self.records is None:
+            return
+        now = time.perf_counter()
+        usage = frame.memory_usage(index=True)
+        self.records.append(
+            StageStats(
+                stage,
+                self.z_key,
+                now - self.start,
+                len(frame),
+                int(usage.sum()) if isinstance(usage, pd.Series) else int(usage),
+            )
+        )
+        self.start = now
+
+    def flush(self, callback):
+        """Pass the records so far to ``callback``."""
+        if self.records:
+            for record in self.records:
+                callback(record)
+            self.records.clear()
 
 
 def _listify(var):
@@ -45,29 +114,1265 @@ def _listify(var):
     return var
 
 
-def _get_parameter_values(string, parameters, separators):
-    parameter_list = re.split("|".join(map(re.escape, separators)), string)
-    parameter_list = [x for x in parameter_list if x]  # Remove leftovers of separation
-    new_parameter_list = []
-    for param in parameter_list:
-        p_hit = False
-        for p_v in sorted(person_values, key=len, reverse=True):
-            if param.startswith(p_v):
-                new_parameter_list += list(filter(None, list(param.partition(p_v))))
-                p_hit = True
+@define
+class LRUCache:
+    """A thread-safe mapping which keeps at most ``maxsize`` items, dropping the least
+    recently used ones first."""
+
+    maxsize: int = 1024
+    """The maximum number of items kept."""
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    _items: OrderedDict = field(init=False, repr=False, factory=OrderedDict)
+    _lock: threading.Lock = field(init=False, repr=False, factory=threading.Lock)
+
+    def find(self, key, default=None):
+        """Get the item stored for ``key``, or ``default``."""
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                self._items.move_to_end(key)
+                return self._items[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Store ``value`` for ``key``."""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get(self, key, func):
+        """Get the item stored for ``key``, or store and return ``func(key)``."""
+        value = self.find(key, _END)
+        if value is _END:
+            value = func(key)
+            self.put(key, value)
+        return value
+
+    def values(self):
+        """Returns: the items kept, from the least to the most recently used."""
+        with self._lock:
+            return list(self._items.values())
+
+    def cache_info(self):
+        """Report cache statistics.
+
+        Returns:
+            a ``CacheInfo(hits, misses, maxsize, currsize)`` named tuple
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._items))
+
+    def cache_clear(self):
+        """Empty the cache and reset the statistics."""
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+@define
+class ComposeStats:
+    """Collects the :class:`StageStats` reported while composing paradigms. Pass an
+    instance as ``stats`` to :meth:`.Pyradigm.compose_paradigm`. The stages are
+    ``filter``, ``cells`` and ``group`` for all entries, and ``pivot``, ``layout``,
+    ``drop_empty`` and ``write`` for every z group. ``rows`` and ``nbytes`` describe
+    the result of a stage; ``nbytes`` does not include the strings themselves."""
+
+    records: List[StageStats] = Factory(list)
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def to_frame(self):
+        """Returns: a DataFrame with one row per stage and z group."""
+        return pd.DataFrame(self.records, columns=StageStats._fields)
+
+    def summary(self):
+        """Returns: a DataFrame with the total time and rows, the number of times
+        the stage was run and its largest result."""
+        return (
+            self.to_frame()
+            .groupby("stage", sort=False)
+            .agg(
+                seconds=("seconds", "sum"),
+                rows=("rows", "sum"),
+                count=("seconds", "count"),
+                nbytes=("nbytes", "max"),
+            )
+        )
+
+
+@define
+class LabelGrammar:
+    """Splits axis labels like ``"1SG"`` or ``"PRS.IND"`` into parameter values and
+    formats combined values back into labels. Results are memoized per label, since
+    the same labels recur across the whole paradigm.
+    """
+
+    separators: List[str] = Factory(lambda: ["."])
+    """See :attr:`.Pyradigm.separators`"""
+    person_values: List[str] = Factory(lambda: list(person_values))
+    """Values which are written without a separator before the next value
+    (``1SG``, not ``1.SG``)."""
+    maxsize: int = 4096
+    """The maximum number of labels kept in each cache."""
+    _pattern: re.Pattern = field(init=False, repr=False)
+    _trie: Dict = field(init=False, repr=False)
+    _tokens: LRUCache = field(init=False, repr=False)
+    _labels: LRUCache = field(init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        self._tokens = LRUCache(self.maxsize)
+        self._labels = LRUCache(self.maxsize)
+        self._pattern = re.compile("|".join(map(re.escape, self.separators)))
+        self._trie = {}
+        for val in self.person_values:
+            node = self._trie
+            for char in val:
+                node = node.setdefault(char, {})
+            node[None] = val
+
+    def _match_person(self, token):
+        # longest person value the token starts with
+        node = self._trie
+        match = None
+        for char in token:
+            node = node.get(char)
+            if node is None:
                 break
-        if not p_hit:
-            new_parameter_list.append(param)
-    parameter_list = new_parameter_list
-    if len(parameter_list) < len(parameters):
-        print(f"Fewer values ({parameter_list}) than specified: {parameters}")
-        for i in range(0, len(parameters) - len(parameter_list)):
-            del i
-            parameter_list.append(None)
-    elif len(parameter_list) > len(parameters):
-        print(f"More values than specified: {parameters} {parameter_list}")
+            match = node.get(None, match)
+        return match
+
+    def _tokenize(self, label):
+        tokens = []
+        for token in self._pattern.split(label):
+            if not token:  # Remove leftovers of separation
+                continue
+            p_v = self._match_person(token)
+            if p_v is None:
+                tokens.append(token)
+            else:
+                tokens += list(filter(None, token.partition(p_v)))
+        return tuple(tokens)
+
+    def _format(self, label):
+        sep = self.separators[0]
+        for val in self.person_values:
+            if val in label:
+                label = label.replace(val + sep, val)
+        return label
+
+    def tokenize(self, label):
+        """Split a label into its values.
+
+        Args:
+            label (str): an axis label, e.g. ``"1SG"`` or ``"PRS.IND"``
+
+        Returns:
+            a tuple of values, e.g. ``("1", "SG")``
+        """
+        return self._tokens.get(label, self._tokenize)
+
+    def parameter_values(self, label, parameters):
+        """Split a label into one value per parameter.
+
+        Args:
+            label (str): an axis label
+            parameters (list): the parameters expected in the label
+
+        Returns:
+            a list of values, padded with ``None`` if the label contains fewer values
+            than there are parameters.
+        """
+        parameter_list = list(self.tokenize(label))
+        if len(parameter_list) < len(parameters):
+            print(f"Fewer values ({parameter_list}) than specified: {parameters}")
+            parameter_list += [None] * (len(parameters) - len(parameter_list))
+        elif len(parameter_list) > len(parameters):
+            print(f"More values than specified: {parameters} {parameter_list}")
+            sys.exit(1)
+        return parameter_list
+
+    def format_label(self, label):
+        """Remove separators following person values (``1.SG`` becomes ``1SG``)."""
+        return self._labels.get(label, self._format)
+
+    def cache_info(self):
+        """Report label cache statistics.
+
+        Returns:
+            a ``CacheInfo(hits, misses, maxsize, currsize)`` named tuple
+        """
+        return CacheInfo(
+            *[sum(x) for x in zip(self._tokens.cache_info(), self._labels.cache_info())]
+        )
+
+    def cache_clear(self):
+        """Empty the label caches and reset the statistics."""
+        self._tokens.cache_clear()
+        self._labels.cache_clear()
+
+
+@lru_cache(maxsize=32)
+def _get_label_grammar(separators, p_values):
+    return LabelGrammar(separators=list(separators), person_values=list(p_values))
+
+
+def get_label_grammar(separators, p_values=None):
+    """Get a shared :class:`.LabelGrammar` for the given separators and person values.
+
+    Args:
+        separators (list): see :attr:`.Pyradigm.separators`
+        p_values (list): see :attr:`.LabelGrammar.person_values`
+
+    Returns:
+        a :class:`.LabelGrammar` object
+    """
+    if p_values is None:
+        p_values = person_values
+    return _get_label_grammar(tuple(_listify(separators)), tuple(p_values))
+
+
+def _axis_parameter_values(labels, parameters, grammar):
+    """Map the labels of a paradigm axis to parameter values. Hierarchical axes (one
+    level per parameter, matched by name or else by position) and axes named after
+    their only parameter are taken as they are; other labels are parsed once each.
+
+    Returns: the code of every label, and for every parameter an array of its values
+    for the distinct labels"""
+    codes, uniques = pd.factorize(labels)
+    names = list(labels.names)
+    if len(names) == len(parameters) and (
+        isinstance(labels, pd.MultiIndex) or names == parameters
+    ):
+        if set(names) == set(parameters):
+            levels = [names.index(param) for param in parameters]
+        else:
+            levels = range(len(parameters))
+        if not isinstance(uniques, pd.MultiIndex):
+            uniques = pd.MultiIndex.from_arrays([uniques])
+        return codes, [
+            uniques.get_level_values(level).to_numpy(dtype=object) for level in levels
+        ]
+    parsed = [grammar.parameter_values(s, parameters) for s in uniques]
+    values = []
+    for i in range(len(parameters)):
+        param_values = np.empty(len(parsed), dtype=object)
+        param_values[:] = [p_values[i] for p_values in parsed]
+        values.append(param_values)
+    return codes, values
+
+
+def _identity(value):
+    return value
+
+
+def _print_cell_string(series, category_joiner):
+    return category_joiner.join(series.unique())
+
+
+def _get_executor(func, workers):
+    try:
+        pickle.dumps(func)
+        return ProcessPoolExecutor(max_workers=workers)
+    except (pickle.PicklingError, AttributeError, TypeError, OSError) as e:
+        log.debug(f"Falling back to threads: {e}")
+        return ThreadPoolExecutor(max_workers=workers)
+
+
+def _imap_parallel(func, items, workers=None):
+    """Lazily apply ``func`` to all ``items``, preserving their order. With
+    ``workers`` set, a process pool is used, or a thread pool if ``func`` cannot be
+    pickled or no processes can be started. Only a few items per worker are
+    submitted ahead of the results being consumed. Items wrapped in ``_Done`` are
+    passed through as results."""
+    if not workers or workers == 1:
+        for item in items:
+            yield item.value if isinstance(item, _Done) else func(item)
+        return
+    items = iter(items)
+    pending = deque()
+    executor = _get_executor(func, workers)
+
+    def submit(item):
+        if isinstance(item, _Done):
+            future = Future()
+            future.set_result(item.value)
+            return future
+        return executor.submit(func, item)
+    try:
+        while True:
+            try:
+                while len(pending) < 2 * workers:
+                    item = next(items, _END)
+                    if item is _END:
+                        break
+                    pending.append((item, submit(item)))
+                if not pending:
+                    return
+                result = pending[0][1].result()
+            except BrokenProcessPool as e:
+                log.debug(f"Falling back to threads: {e}")
+                executor.shutdown()
+                executor = ThreadPoolExecutor(max_workers=workers)
+                pending = deque((item, submit(item)) for item, _ in pending)
+                continue
+            pending.popleft()
+            yield result
+    finally:
+        executor.shutdown()
+
+
+def _as_object(series):
+    """Decode categorical series, so string operations can be applied."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object)
+    return series
+
+
+def _has_missing(df):
+    return any(df[col].hasnans for col in df.columns)
+
+
+def _intern(codes, uniques):
+    """Build an array of the (interned) ``uniques`` from their ``codes``."""
+    interned = np.empty(len(uniques), dtype=object)
+    interned[:] = [sys.intern(u) if isinstance(u, str) else u for u in uniques]
+    return interned[codes]
+
+
+def _compact_frame(df, print_columns):
+    """Store parameters with few distinct values as categoricals and everything else
+    as interned strings. Missing values are replaced with empty strings."""
+    out = {}
+    for col in df.columns:
+        codes, uniques = pd.factorize(_as_object(df[col]).fillna(""))
+        if col not in print_columns and len(uniques) <= len(df) / 2:
+            out[col] = pd.Categorical.from_codes(
+                codes, categories=uniques
+            ).reorder_categories(sorted(uniques))
+        else:
+            out[col] = _intern(codes, uniques)
+    return pd.DataFrame(out, index=df.index, columns=df.columns)
+
+
+def _append_compact(df, rows, print_columns):
+    """Append ``rows`` to the compact frame ``df``. The categories of categorical
+    columns are extended by the new values, so only ``rows`` is factorized (and
+    columns which ``df`` does not have yet)."""
+    head, tail = {}, {}
+    for col in df.columns:
+        column = df[col]
+        if col in rows.columns:
+            values = _as_object(rows[col]).fillna("")
+        else:
+            values = pd.Series("", index=rows.index, dtype=object)
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            new = set(values) - set(column.cat.categories)
+            if new:
+                column = column.cat.set_categories(
+                    sorted(set(column.cat.categories) | new)
+                )
+            tail[col] = pd.Categorical(values, categories=column.cat.categories)
+        else:
+            tail[col] = _intern(*pd.factorize(values))
+        head[col] = column
+    combined = pd.concat(
+        [
+            pd.DataFrame(head, index=df.index, columns=df.columns),
+            pd.DataFrame(tail, index=rows.index, columns=df.columns),
+        ]
+    )
+    added = [col for col in rows.columns if col not in df.columns]
+    if added:
+        filler = pd.DataFrame("", index=df.index, columns=added)
+        extra = _compact_frame(
+            pd.concat([filler, rows[added]], ignore_index=True), print_columns
+        )
+        for col in added:
+            combined[col] = extra[col].values
+    return combined
+
+
+def _shared_memory():
+    try:
+        # pylint: disable=import-outside-toplevel
+        from multiprocessing import shared_memory
+    except ImportError:
+        print("Sharing entries requires Python 3.8 or later")
         sys.exit(1)
-    return parameter_list
+    return shared_memory
+
+
+def _code_dtype(n_categories):
+    """The dtype pandas uses for the codes of a categorical, so they are not
+    copied when the categorical is built."""
+    for dtype in [np.int8, np.int16, np.int32]:
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _encode_columns(df, fill=None):
+    """Factorize every column of ``df``, optionally replacing missing values with
+    ``fill``. Returns the vocabularies and the codes, in the dtype pandas uses for
+    categoricals."""
+    vocabularies, codes = [], []
+    for col in df.columns:
+        values = _as_object(df[col])
+        if fill is not None:
+            values = values.fillna(fill)
+        col_codes, uniques = pd.factorize(values)
+        vocabularies.append(list(uniques))
+        codes.append(col_codes.astype(_code_dtype(len(uniques))))
+    return vocabularies, codes
+
+
+def _decode_columns(columns, vocabularies, codes, index=None):
+    """Build a frame of categoricals on ``codes`` (without copying them)."""
+    data = {
+        col: pd.Categorical.from_codes(col_codes, categories=vocabulary)
+        for col, vocabulary, col_codes in zip(columns, vocabularies, codes)
+    }
+    return pd.DataFrame(data, columns=columns, index=index, copy=False)
+
+
+def _release_shared_memory(shm, unlink):
+    try:
+        shm.close()
+    except BufferError:  # frames built on the block still exist
+        pass
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedEntries:
+    """Entries published in shared memory by :meth:`.Pyradigm.share`: every column is
+    stored as an array of integer codes in a single shared memory block, plus a
+    vocabulary of its values. Pickling only transfers the vocabularies and the name
+    of the block, so instances can be passed to worker processes, where
+    :meth:`.SharedEntries.frame` builds the entries on the block without copying it.
+
+    Only the publishing instance frees the block, when it is closed (it can be used
+    as a context manager), garbage collected, or the interpreter exits, regardless of
+    what happened to the workers. Workers have to be started by the publishing
+    process, e.g. with a ``ProcessPoolExecutor``. Row labels are not shared."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, name, columns, vocabularies, dtypes, offsets, n_rows
+    ):
+        self.name = name
+        self.columns = columns
+        self.vocabularies = vocabularies
+        self.dtypes = dtypes
+        self.offsets = offsets
+        self.n_rows = n_rows
+        self._shm = None
+        self._finalizer = None
+
+    @classmethod
+    def publish(cls, entries):
+        """Copy ``entries`` into a new shared memory block. Missing values are
+        replaced with empty strings.
+
+        Returns:
+            a :class:`.SharedEntries` object
+        """
+        shared_memory = _shared_memory()
+        vocabularies, codes = _encode_columns(entries, fill="")
+        offsets, size = [], 0
+        for col_codes in codes:
+            offsets.append(size)
+            size += -(-col_codes.nbytes // 8) * 8  # keep every array aligned
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for offset, col_codes in zip(offsets, codes):
+            np.ndarray(
+                col_codes.shape, dtype=col_codes.dtype, buffer=shm.buf, offset=offset
+            )[:] = col_codes
+        shared = cls(
+            shm.name,
+            list(entries.columns),
+            vocabularies,
+            [col_codes.dtype.str for col_codes in codes],
+            offsets,
+            len(entries),
+        )
+        shared._shm = shm
+        shared._finalizer = weakref.finalize(shared, _release_shared_memory, shm, True)
+        return shared
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            (
+                self.name,
+                self.columns,
+                self.vocabularies,
+                self.dtypes,
+                self.offsets,
+                self.n_rows,
+            ),
+        )
+
+    def frame(self):
+        """Build the entries on the shared memory block, with categorical columns.
+
+        Returns: a `pandas DataFrame\
+        <https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.html>`_ object
+        """
+        if self._shm is None:
+            self._shm = _shared_memory().SharedMemory(name=self.name)
+            self._finalizer = weakref.finalize(
+                self, _release_shared_memory, self._shm, False
+            )
+        codes = []
+        for dtype, offset in zip(self.dtypes, self.offsets):
+            col_codes = np.ndarray(
+                (self.n_rows,), dtype=dtype, buffer=self._shm.buf, offset=offset
+            )
+            col_codes.flags.writeable = False
+            codes.append(col_codes)
+        return _decode_columns(self.columns, self.vocabularies, codes)
+
+    def close(self):
+        """Detach from the block; the publishing instance also frees it."""
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _cache_dir(path, cache):
+    """The sidecar cache of ``path``: next to it, or in the directory ``cache``."""
+    path = Path(path).resolve()
+    if cache is True:
+        return path.with_name(path.name + ".pyradigms")
+    digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:16]
+    return Path(cache) / f"{path.name}-{digest}.pyradigms"
+
+
+def _cache_key(path, options):
+    stat = Path(path).stat()
+    return json.dumps(
+        {
+            "path": str(Path(path).resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "options": options,
+        },
+        sort_keys=True,
+    )
+
+
+def _read_cache(cache_dir, key):
+    """Map the frame in ``cache_dir``, if it was stored with ``key``."""
+    try:
+        meta = json.loads((cache_dir / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if meta["key"] != key:
+        return None
+    codes = [
+        np.load(cache_dir / f"{i}.npy", mmap_mode="r")
+        for i in range(len(meta["columns"]))
+    ]
+    index = None
+    if meta["index"] is not None:
+        index = _axis_from_json(meta["index"], meta["index_names"])
+    columns = _axis_from_json(meta["columns"], meta["column_names"])
+    return _decode_columns(columns, meta["vocabularies"], codes, index)
+
+
+def _axis_from_json(labels, names):
+    if len(names) > 1:
+        return pd.MultiIndex.from_tuples(
+            [tuple(label) for label in labels], names=names
+        )
+    return pd.Index(labels, name=names[0], dtype=object)
+
+
+def _write_cache(cache_dir, key, df):
+    """Store ``df`` as dictionary-encoded columns, one memory-mappable array of codes
+    per column. The cache is replaced as a whole."""
+    vocabularies, codes = _encode_columns(df)
+    index = None
+    if not isinstance(df.index, pd.RangeIndex):
+        index = list(df.index)
+    tmp_dir = cache_dir.with_name(cache_dir.name + f".{os.getpid()}.tmp")
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    for i, col_codes in enumerate(codes):
+        np.save(tmp_dir / f"{i}.npy", col_codes)
+    meta = {
+        "key": key,
+        "columns": list(df.columns),
+        "column_names": list(df.columns.names),
+        "vocabularies": vocabularies,
+        "index": index,
+        "index_names": list(df.index.names),
+    }
+    # the metadata is written last, so incomplete caches are never read
+    (tmp_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+
+def _parse_csv(  # pylint: disable=too-many-arguments
+    path, data_format, chunksize, filters, ignore, axes=None
+):
+    """Read a CSV file in ``data_format``. Long data is returned in wide format.
+    If the ``x`` and ``y`` ``axes`` are given, paradigms are read with one header row
+    per x parameter and one index column per y parameter.
+
+    Returns: the DataFrame and its format"""
+    if data_format == "wide":
+        if filters or ignore or chunksize:
+            df = _read_csv_chunks(
+                path,
+                chunksize,
+                row_filter=partial(_select_entries, filters=filters, ignore=ignore),
+                usecols=lambda col: col not in ignore or col in filters,
+            )
+        else:
+            df = pd.read_csv(path, keep_default_na=False, dtype=str)
+    elif data_format == "long":
+        # the long table is only held in memory one chunk at a time
+        accumulator = _LongAccumulator()
+        for chunk in _iter_csv_chunks(
+            path,
+            chunksize,
+            row_filter=lambda chunk: chunk[~chunk["Parameter"].isin(ignore)],
+        ):
+            accumulator.add(chunk)
+        df = accumulator.to_frame()
+        data_format = "wide"
+    else:
+        header, index_col = 0, 0
+        if axes:
+            header, index_col = [list(range(max(1, len(axis)))) for axis in axes]
+        df = pd.read_csv(
+            path, keep_default_na=False, dtype=str, header=header, index_col=index_col
+        )
+        if (
+            header == [0]
+            and len(df) > 0
+            and list(_listify(df.index[0])) == list(axes[1])
+            and (df.iloc[0] == "").all()
+        ):
+            # the row of index names written below a single level of column labels
+            df.columns.name = df.index.names[0]
+            df.index.names = axes[1]
+            df = df.iloc[1:]
+    return df, data_format
+
+
+def _require_parquet():
+    try:
+        # pylint: disable=import-outside-toplevel,unused-import
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("Install pyarrow to read and write Parquet files")
+        sys.exit(1)
+
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+@contextmanager
+def _open_output(path, compression=None):
+    """Open ``path`` for writing text, optionally compressed. Yields ``None`` if
+    there is no path."""
+    if path is None:
+        yield None
+        return
+    if compression == "gzip":
+        file = gzip.open(path, "wt", encoding="utf-8")
+    elif compression == "zstd":
+        try:
+            import zstandard  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            print("Install zstandard to write zstd-compressed files")
+            sys.exit(1)
+        file = zstandard.open(path, "wt", encoding="utf-8")
+    else:
+        file = open(path, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+    with file:
+        yield file
+
+
+_COMPOSE_ATTRIBUTES = [
+    "x",
+    "y",
+    "z",
+    "sort_orders",
+    "filters",
+    "ignore",
+    "with_multi_index",
+    "separators",
+    "category_joiner",
+    "print_columns",
+    "print_sep",
+    "person_values",
+]
+
+
+def _canonical(value):
+    """A hashable representation of composition parameters. Mappings are compared
+    regardless of the order of their keys."""
+    if isinstance(value, dict):
+        items = ((k, _canonical(v)) for k, v in value.items())
+        return tuple(sorted(items, key=lambda item: str(item[0])))
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(v) for v in value)
+    if isinstance(value, Path):
+        return str(value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def _fingerprint(df):
+    """A hash of the content of ``df``."""
+    content = hashlib.sha1(pd.util.hash_pandas_object(df).to_numpy().tobytes())
+    content.update(repr(list(df.columns)).encode("utf-8"))
+    return content.hexdigest()
+
+
+def _filter_rows(df, filters):
+    for col, values in filters.items():
+        df = df[df[col].isin(_listify(values))]
+    return df
+
+
+def _select_entries(df, filters, ignore):
+    """Keep the rows matching ``filters``, then drop the ``ignore``d columns."""
+    df = _filter_rows(df, filters)
+    return df.drop(columns=[col for col in ignore if col in df.columns])
+
+
+def _iter_csv_chunks(path, chunksize, row_filter=None, **kwargs):
+    """Read a CSV file in chunks of ``chunksize`` rows, passing every chunk through
+    ``row_filter``. Row labels are those of the full file."""
+    reader = pd.read_csv(
+        path,
+        keep_default_na=False,
+        dtype=str,
+        chunksize=chunksize or 100000,
+        **kwargs,
+    )
+    try:
+        for chunk in reader:
+            yield row_filter(chunk) if row_filter else chunk
+    finally:
+        reader.close()
+
+
+def _read_csv_chunks(path, chunksize, row_filter=None, **kwargs):
+    return pd.concat(list(_iter_csv_chunks(path, chunksize, row_filter, **kwargs)))
+
+
+class _LongAccumulator:
+    """Collects long format rows (``ID``, ``Parameter``, ``Value``) as integer codes
+    into vocabularies, so a long table never has to be held in memory as a whole."""
+
+    columns = ["ID", "Parameter", "Value"]
+
+    def __init__(self):
+        self.vocabularies = [{}, {}, {}]
+        self.codes = [[], [], []]
+        self.incomplete = 0
+
+    def add(self, chunk):
+        incomplete = (
+            chunk["ID"].isna()
+            | chunk["ID"].eq("")
+            | chunk["Parameter"].isna()
+            | chunk["Parameter"].eq("")
+        )
+        if incomplete.any():
+            self.incomplete += int(incomplete.sum())
+            chunk = chunk[~incomplete]
+        for vocabulary, codes, col in zip(self.vocabularies, self.codes, self.columns):
+            chunk_codes, uniques = pd.factorize(chunk[col])
+            mapping = np.array(
+                [vocabulary.setdefault(value, len(vocabulary)) for value in uniques]
+                + [-1],  # missing values
+                dtype=np.int32,
+            )
+            codes.append(mapping[chunk_codes])
+        return self
+
+    def to_frame(self):
+        """Build the wide entries, with IDs and parameters sorted like
+        ``DataFrame.pivot`` would. Only the first value of every (ID, Parameter)
+        pair is kept; duplicates are reported."""
+        ids, params, values = [
+            np.array(list(vocabulary), dtype=object) for vocabulary in self.vocabularies
+        ]
+        id_codes, param_codes, value_codes = [
+            np.concatenate(codes) if codes else np.array([], dtype=np.int32)
+            for codes in self.codes
+        ]
+        if self.incomplete:
+            log.warning(
+                "Rows without ID or Parameter: %s. They are dropped.", self.incomplete
+            )
+        grid = np.full((len(ids), len(params)), -1, dtype=np.int32)
+        duplicated = pd.Series(
+            id_codes.astype(np.int64) * len(params) + param_codes
+        ).duplicated().to_numpy()
+        first = ~duplicated
+        grid[id_codes[first], param_codes[first]] = value_codes[first]
+        if duplicated.any():
+            conflicting = duplicated & (
+                grid[id_codes, param_codes] != value_codes
+            )
+            examples = ", ".join(
+                f"({ids[i]}, {params[p]})"
+                for i, p in zip(id_codes[conflicting][:5], param_codes[conflicting][:5])
+            )
+            log.warning(
+                "Duplicate (ID, Parameter) pairs: %s, with conflicting values: %s%s."
+                " The first value is kept.",
+                duplicated.sum(),
+                conflicting.sum(),
+                f" ({examples}…)" if examples else "",
+            )
+        values = np.append(values, np.nan)
+        id_order = np.argsort(ids, kind="stable")
+        param_order = np.argsort(params, kind="stable")
+        grid = grid[id_order]
+        return pd.DataFrame(
+            {params[p]: values[grid[:, p]] for p in param_order},
+            index=pd.Index(ids[id_order], name="ID"),
+        )
+
+
+def _paradigm_name(path):
+    """The file name of ``path``, without ``.csv`` and compression suffixes."""
+    name = Path(path).name
+    for suffix in list(COMPRESSION_SUFFIXES.values()) + [".csv"]:
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    return name
+
+
+def _decompose_file(path, kwargs):
+    """Decompose the paradigm in a CSV file. The z value is taken from the index
+    name, or the file name."""
+    paradigm = pd.read_csv(path, keep_default_na=False, dtype=str, index_col=0)
+    z_value = paradigm.index.name or _paradigm_name(path)
+    return Pyradigm().decompose_paradigm(paradigm, z_value=z_value, **kwargs)
+
+
+def _complete_orders(df, parameters, z, sort_orders, filters):
+    """Copy ``sort_orders``, replacing the orders of ``parameters`` which do not cover
+    all their values in ``df`` by guessed ones, as composing does. Guessed orders
+    are those in ``filters``, or else the order of first appearance. Orders for ``z``
+    are only guessed if missing."""
+    if df is None:
+        return {p: list(o) for p, o in sort_orders.items()}
+    df = _filter_rows(df, filters)
+    values = {
+        parameter: list(pd.unique(_as_object(df[parameter]).fillna("")))
+        for parameter in list(parameters) + list(z)
+    }
+    return _guess_orders(values, parameters, z, sort_orders, filters)
+
+
+def _check_composition(columns, axes, print_columns, ignore, engine, compression):
+    """Exit if the ``axes`` or ``print_columns`` are missing from ``columns`` or the
+    engine or compression are unknown, and report the columns which are neither used
+    nor ignored. Without ``columns``, only the engine and compression are checked."""
+    # check if all axes have valid parameters
+    if columns is not None:
+        for k, v in axes.items():
+            remainders = set(v) - set(columns)
+            if len(remainders) > 0:
+                rstring = ", ".join(remainders)
+                print(f"{k} axis contains inexistent parameter(s): {rstring}")
+                sys.exit(1)
+
+    if engine not in ["native", "pivot_table", "sparse"]:
+        print(f"Invalid engine: {engine}")
+        sys.exit(1)
+
+    if compression and compression not in COMPRESSION_SUFFIXES:
+        print(f"Invalid compression: {compression}")
+        sys.exit(1)
+
+    if columns is None:
+        return
+
+    # make sure that "Form" or whatever other column to print is present
+    for print_col in print_columns:
+        if print_col not in columns:
+            print(f"'{print_col}' not found in dataframe columns")
+            sys.exit(1)
+
+    # inform user if there are columns they did not give directions for
+    used = [p for params in axes.values() for p in params]
+    leftover_columns = set(columns) - set(used + list(print_columns)) - set(ignore)
+    if len(leftover_columns) > 0:
+        log.info(
+            "You did not specify what should happen"
+            " to the following columns/fields/parameters: %s",
+            ", ".join(leftover_columns),
+        )
+
+
+def _freeze(value):
+    """Copy lists and dicts in ``value`` to tuples, dicts as ``(key, value)`` pairs."""
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _guess_orders(values, parameters, z, sort_orders, filters):
+    """Like :func:`_complete_orders`, from the ``values`` of every parameter in order
+    of first appearance."""
+    orders = {p: list(o) for p, o in sort_orders.items()}
+    for parameter in list(parameters) + list(z):
+        if parameter in filters:
+            guessed = list(filters[parameter])
+        else:
+            guessed = list(values[parameter])
+        if parameter not in orders:
+            log.info("Guessing order %s for parameter %s", guessed, parameter)
+            orders[parameter] = guessed
+        elif parameter not in z and set(guessed) - set(orders[parameter]):
+            log.info(
+                "Specified order %s for parameter '%s' does not cover all values: %s.",
+                orders[parameter],
+                parameter,
+                set(guessed) - set(orders[parameter]),
+            )
+            log.info("Guessing order %s for parameter %s", guessed, parameter)
+            orders[parameter] = guessed
+    return orders
+
+
+def _compose_shard(path, options):
+    """Compose the paradigms for the entries in a shard file."""
+    entries = pd.read_csv(path, keep_default_na=False, dtype=str)
+    return list(Pyradigm(entries=entries)._iter_paradigms(input_df=entries, **options))
+
+
+def _run_plan(plan):
+    return plan.run()
+
+
+def _copy_paradigms(result):
+    if isinstance(result, dict):
+        return {z_key: paradigm.copy() for z_key, paradigm in result.items()}
+    return None if result is None else result.copy()
+
+
+def _join_columns(df, columns, sep):
+    """Join the string ``columns`` of ``df`` row by row with ``sep``."""
+    out = _as_object(df[columns[0]])
+    for col in columns[1:]:
+        out = out + sep + _as_object(df[col])
+    return out
+
+
+def _concat_values(df, columns, sep, p_values):
+    """Join the string ``columns`` of ``df`` row by row with ``sep``, except after
+    person values (``1SG``, not ``1.SG``)."""
+    out = None
+    for col in columns:
+        values = _as_object(df[col])
+        values = values.where(values.isin(p_values), values + sep)
+        out = values if out is None else out + values
+    return out.str.strip(sep).str.replace(sep + sep, sep, regex=False)
+
+
+def _map_unique(series, func):
+    """Apply ``func`` to ``series``, calling it only once per distinct value."""
+    if func is _identity:
+        return series
+    return series.map({value: func(value) for value in series.unique()})
+
+
+def _sort_z_keys(z_values, z_columns, z_orders):
+    """Sort the distinct ``z_values`` by the ranks of the values they combine
+    (``z_columns``) in ``z_orders``. Values missing from an order are ranked last."""
+    first = ~z_values.duplicated().to_numpy()
+    keys = np.asarray(z_values, dtype=object)[first]
+    ranks = []
+    for column, order in zip(z_columns, z_orders):
+        rank = {}
+        for i, value in enumerate(order):
+            rank.setdefault(value, i)
+        values = pd.Series(np.asarray(column, dtype=object)[first])
+        ranks.append(values.map(rank).fillna(len(order)).to_numpy())
+    return list(keys[np.lexsort(ranks[::-1])])
+
+
+def _factorize_axis(df, params):
+    """Integer codes for the value combinations of ``params``, and an index of the
+    combinations in sorted order (like ``pd.pivot_table`` would produce)."""
+    grouped = df.groupby(params, sort=True, observed=True)
+    index = grouped.size().index
+    if isinstance(index, pd.MultiIndex):
+        index = index.set_levels([level.astype(object) for level in index.levels])
+    else:
+        index = index.astype(object)
+    return grouped.ngroup().to_numpy(), index
+
+
+def _native_pivot(df, x, y, category_joiner):
+    """Lay out the cells of ``df`` on a grid spanned by the ``y`` and ``x`` values.
+    Multiple distinct values in a cell are joined with ``category_joiner``."""
+    y_codes, index = _factorize_axis(df, y)
+    x_codes, columns = _factorize_axis(df, x)
+    n_cells = len(index) * len(columns)
+    cells = pd.DataFrame(
+        {
+            "cell": y_codes * len(columns) + x_codes,
+            "value": df["pyradigms_cell"].to_numpy(dtype=object),
+        }
+    )
+    cells = cells[~cells.duplicated()]  # unique values per cell, in order of appearance
+    counts = np.bincount(cells["cell"], minlength=n_cells)
+    single = counts[cells["cell"]] == 1
+    grid = np.full(n_cells, np.nan, dtype=object)
+    grid[cells["cell"][single]] = cells["value"][single].to_numpy()
+    # only cells with several values need joining
+    for cell, values in cells[~single].groupby("cell", sort=False)["value"]:
+        grid[cell] = category_joiner.join(values)
+    return pd.DataFrame(
+        grid.reshape(len(index), len(columns)), index=index, columns=columns
+    )
+
+
+def _sparse_pivot(df, x, y, category_joiner):
+    """Like :func:`_native_pivot`, but rows and columns without any content are
+    never allocated. They are found by counting the non-empty cells per row and
+    column code, so the full grid of ``y`` and ``x`` combinations is never built."""
+    y_codes, index = _factorize_axis(df, y)
+    x_codes, columns = _factorize_axis(df, x)
+    cells = pd.DataFrame(
+        {
+            "cell": y_codes * len(columns) + x_codes,
+            "value": df["pyradigms_cell"].to_numpy(dtype=object),
+        }
+    )
+    cells = cells[~cells.duplicated()]
+    multiple = cells["cell"].duplicated(keep=False).to_numpy()
+    joined = cells[multiple].groupby("cell", sort=False)["value"].agg(
+        category_joiner.join
+    )
+    cell = np.concatenate([cells["cell"].to_numpy()[~multiple], joined.index])
+    value = np.concatenate([cells["value"].to_numpy()[~multiple], joined.to_numpy()])
+    occupied = value != ""
+    cell, value = cell[occupied], value[occupied]
+    rows, cols = cell // len(columns), cell % len(columns)
+    keep_rows = np.flatnonzero(np.bincount(rows, minlength=len(index)))
+    keep_cols = np.flatnonzero(np.bincount(cols, minlength=len(columns)))
+    row_map = np.zeros(len(index), dtype=np.intp)
+    row_map[keep_rows] = np.arange(len(keep_rows))
+    col_map = np.zeros(len(columns), dtype=np.intp)
+    col_map[keep_cols] = np.arange(len(keep_cols))
+    grid = np.full((len(keep_rows), len(keep_cols)), "", dtype=object)
+    grid[row_map[rows], col_map[cols]] = value
+    return pd.DataFrame(grid, index=index[keep_rows], columns=columns[keep_cols])
+
+
+layout_cache = LRUCache(maxsize=256)
+"""Axis layouts shared by paradigms with the same row and column labels."""
+
+
+def _sort_and_flatten(  # pylint: disable=too-many-arguments
+    out,
+    x,
+    y,
+    sort_orders,
+    with_multi_index,
+    category_joiner,
+    separators,
+    grammar,
+    decorate_x,
+    decorate_y,
+):
+    """Sort the axes of a paradigm and flatten them, unless ``with_multi_index``."""
+    # sort x and y axis
+    new_indices = []
+    for idx in y:
+        values = out.index.get_level_values(idx)
+        new_indices.append(
+            pd.CategoricalIndex(values, categories=sort_orders[idx], ordered=True)
+        )
+    out.set_index(new_indices, inplace=True)
+    out.sort_index(level=[c for c in sort_orders if c in y], inplace=True)
+
+    new_columns = []
+    for col in x:
+        values = out.columns.get_level_values(col)
+        new_columns.append(
+            pd.CategoricalIndex(values, categories=sort_orders[col], ordered=True)
+        )
+    out.columns = new_columns
+    out.sort_index(
+        level=reversed([c for c in sort_orders if c in x]), inplace=True, axis=1
+    )
+
+    if not with_multi_index:
+        log.debug("Flattening multiindices")
+        new_colindex_name = category_joiner.join(x)
+        out.columns = [
+            decorate_x(grammar.format_label(separators[0].join(col).strip()))
+            for col in out.columns.values
+        ]
+        out.columns.name = new_colindex_name
+
+        new_index_name = category_joiner.join(y)
+        out.index = [
+            decorate_y(grammar.format_label(separators[0].join(_listify(col)).strip()))
+            for col in out.index.values
+        ]
+        out.index.name = new_index_name
+    return out
+
+
+def _axis_layout(index, columns, arrange):
+    """Find the row and column order and the new axes that ``arrange`` produces for a
+    frame with ``index`` and ``columns``, by arranging a frame of cell numbers."""
+    n_cols = len(columns)
+    probe = pd.DataFrame(
+        np.arange(len(index) * n_cols).reshape(len(index), n_cols),
+        index=index,
+        columns=columns,
+    )
+    probe = arrange(probe)
+    cell_numbers = probe.to_numpy()
+    if cell_numbers.size == 0:  # no cells to reorder, only the axes
+        return (
+            np.arange(len(probe.index)),
+            probe.index,
+            np.arange(n_cols),
+            probe.columns,
+        )
+    return (
+        cell_numbers[:, 0] // n_cols,
+        probe.index,
+        cell_numbers[0, :] % n_cols,
+        probe.columns,
+    )
+
+
+def _compose_z_group(  # pylint: disable=too-many-locals
+    task,
+    x,
+    y,
+    decorate_x,
+    decorate_y,
+    category_joiner,
+    separators,
+    p_values,
+    with_multi_index,
+    drop_empty,
+    engine="native",
+    compression=None,
+    timed=False,
+):
+    """Build the paradigm for a single z group. ``task`` is a tuple of the z key,
+    the group's entries, the sort orders to use and an optional output path.
+    Returns the z key, the paradigm and, if ``timed``, a list of :class:`StageStats`."""
+    z_key, df, sort_orders, path = task
+    timer = _StageTimer(timed, z_key)
+    grammar = get_label_grammar(separators, p_values)
+    # only flat paradigms without empty rows and columns are built sparsely
+    sparse = engine == "sparse" and x and y and drop_empty and not with_multi_index
+    if sparse:
+        out = _sparse_pivot(df, x, y, category_joiner)
+    elif engine in ["native", "sparse"] and x and y:
+        out = _native_pivot(df, x, y, category_joiner)
+    else:
+        df = df.astype({param: object for param in x + y})
+        out = pd.pivot_table(
+            df,
+            values="pyradigms_cell",
+            index=y,
+            columns=x,
+            aggfunc=lambda x: _print_cell_string(x, category_joiner),
+        )
+    if not sparse:
+        # drop empty rows
+        idx_name = out.index.names
+        out.reset_index(inplace=True)  # use index as column
+        out.replace("", np.nan, inplace=True)  # replace empty strings with NaN, so we…
+        out.dropna(how="all", inplace=True)  # …drop rows with no content whatsoever
+        out.fillna("", inplace=True)  # then add back the empty strings for exporting
+        out.set_index(idx_name, drop=True, inplace=True)  # then add back the index
+    timer.lap("pivot", out)
+
+    layout_key = (
+        tuple(out.index),
+        tuple(out.columns),
+        tuple(out.index.names),
+        tuple(out.columns.names),
+        tuple((p, tuple(sort_orders[p])) for p in sort_orders if p in x + y),
+        with_multi_index,
+        category_joiner,
+        tuple(separators),
+        tuple(p_values),
+        decorate_x,
+        decorate_y,
+    )
+    row_order, index, col_order, columns = layout_cache.get(
+        layout_key,
+        lambda _: _axis_layout(
+            out.index,
+            out.columns,
+            partial(
+                _sort_and_flatten,
+                x=x,
+                y=y,
+                sort_orders=sort_orders,
+                with_multi_index=with_multi_index,
+                category_joiner=category_joiner,
+                separators=separators,
+                grammar=grammar,
+                decorate_x=decorate_x,
+                decorate_y=decorate_y,
+            ),
+        ),
+    )
+    out = pd.DataFrame(
+        out.to_numpy()[np.ix_(row_order, col_order)],
+        index=index.copy(),
+        columns=columns.copy(),
+    )
+    timer.lap("layout", out)
+
+    # the sparse engine has not allocated any empty rows or columns
+    if not with_multi_index and drop_empty and not sparse:
+        out = out[out.apply(lambda x: "".join(x) != "", axis=1)]
+        dropcols = [col for col in out.columns if "".join(out[col]) != ""]
+        out = out[dropcols]
+        timer.lap("drop_empty", out)
+
+    if path is not None:
+        idx_label = "" if z_key == "z" else z_key
+        with _open_output(path, compression) as file:
+            out.to_csv(file, index=True, index_label=idx_label)
+        timer.lap("write", out)
+    return z_key, out, timer.records
 
 
 @define
@@ -76,7 +1381,9 @@ class Pyradigm:
     parameters and methods used to generate them.
     """
 
-    entries: pd.DataFrame = None
+    entries: pd.DataFrame = field(
+        default=None, on_setattr=lambda self, _, value: self._entries_changed(value)
+    )
     """The data in a wide format pandas DataFrame"""
     x: List[str] = Factory(list)
     """The parameters to be represented on the x axis"""
@@ -109,6 +1416,26 @@ class Pyradigm:
     """The string used to combine columns to be printed in the cells"""
     output_folder = None
     """The folder into which generated paradigms will be written."""
+    person_values: List[str] = Factory(lambda: list(person_values))
+    """Values which are written without a separator before the next value in axis
+    labels (``1SG``, not ``1.SG``)."""
+    result_cache: LRUCache = None
+    """Pass an :class:`.LRUCache` to keep the results of
+    :meth:`.Pyradigm.iter_paradigms` and :meth:`.Pyradigm.compose_paradigm`, keyed by
+    the composition parameters and the content of the entries. Paradigms written to
+    an ``output_folder`` are not cached."""
+    incremental: bool = False
+    """If True, composed paradigms are kept, so that after changes made with
+    :meth:`.Pyradigm.add_entries` or :meth:`.Pyradigm.update_entries` only the
+    paradigms for affected z values are rebuilt (and rewritten in an
+    ``output_folder``) by the next composition with the same parameters. Paradigms
+    are kept for the last eight distinct sets of parameters."""
+    _compositions: LRUCache = field(
+        init=False, repr=False, eq=False, factory=lambda: LRUCache(maxsize=8)
+    )
+    _changes: List = field(init=False, repr=False, eq=False, factory=list)
+    _version: int = field(init=False, repr=False, eq=False, default=0)
+    _inflight: Dict = field(init=False, repr=False, eq=False, factory=dict)
 
     @property
     def _parameters(self):
@@ -119,11 +1446,198 @@ class Pyradigm:
 
     @property
     def _short_repr(self):
-        return self.entries.head().to_string() + f"\n({len(self.entries)} entries)"
+        return _Lazy(lambda: _frame_repr(self.entries))
 
     def update(self, **kwargs):
         for k, v in kwargs.items():
             setattr(self, k, v)
+        if self.result_cache is not None:
+            self.result_cache.cache_clear()
+
+    def _entries_changed(self, entries):
+        if self.result_cache is not None:
+            self.result_cache.cache_clear()
+        self._compositions.cache_clear()
+        self._changes.clear()
+        return entries
+
+    def _result_key(self, kwargs):
+        if self.result_cache is None or kwargs.get("output_folder", self.output_folder):
+            return None
+        return self._request_key(kwargs)
+
+    def _request_key(self, kwargs, fingerprint=None):
+        options = {name: getattr(self, name) for name in _COMPOSE_ATTRIBUTES}
+        options.update(kwargs)
+        options.pop("workers", None)
+        options.pop("stats", None)
+        # the order of the sort orders decides which level is sorted first
+        options["sort_orders"] = list(dict(options["sort_orders"] or {}).items())
+        entries = options.pop("input_df", self.entries)
+        if fingerprint is None:
+            fingerprint = _fingerprint(entries)
+        return _canonical(options), fingerprint
+
+    def _composition_key(self, kwargs):
+        # sort orders are compared per paradigm, since guessed orders are added
+        options = {name: getattr(self, name) for name in _COMPOSE_ATTRIBUTES}
+        options["output_folder"] = self.output_folder
+        options.update(kwargs)
+        options.pop("workers", None)
+        options.pop("stats", None)
+        options.pop("sort_orders", None)
+        return _canonical(options)
+
+    def _record_change(self, rows):
+        if self.result_cache is not None:
+            self.result_cache.cache_clear()
+        if self.incremental:
+            self._version += 1
+            self._changes.append((self._version, rows.astype(object).fillna("")))
+
+    def _dirty_z_keys(self, version, z, separator, p_values):
+        changes = [rows for v, rows in self._changes if v > version]
+        if not changes:
+            return set()
+        if not z:
+            return {"z"}
+        rows = pd.concat(changes)
+        if len(z) > 1:
+            return set(_concat_values(rows, z, separator, p_values))
+        return set(rows[z[0]])
+
+    def add_entries(self, entries):
+        """Append entries. With :attr:`.Pyradigm.incremental`, only the paradigms for
+        their z values are rebuilt by the next composition.
+
+        Args:
+            entries (DataFrame): new entries in wide format, or a list of dicts
+
+        Returns:
+            the :class:`.Pyradigm` object
+        """
+        if not isinstance(entries, pd.DataFrame):
+            entries = pd.DataFrame.from_dict(entries)
+        if self.entries is None:
+            combined = entries
+        else:
+            index = self.entries.index
+            if isinstance(entries.index, pd.RangeIndex) and not isinstance(
+                index, pd.RangeIndex
+            ):
+                # unlabeled rows are numbered after the existing labels
+                start = 0
+                if len(index) > 0 and pd.api.types.is_integer_dtype(index):
+                    start = index.max() + 1
+                entries = entries.set_axis(pd.RangeIndex(start, start + len(entries)))
+            duplicates = index.intersection(entries.index)
+            if not isinstance(index, pd.RangeIndex) and len(duplicates) > 0:
+                print(f"Entries exist already: {', '.join(map(str, duplicates))}")
+                sys.exit(1)
+            if any(
+                isinstance(dtype, pd.CategoricalDtype) for dtype in self.entries.dtypes
+            ):
+                combined = _append_compact(self.entries, entries, self.print_columns)
+            else:
+                combined = pd.concat([self.entries, entries])
+            if isinstance(index, pd.RangeIndex):
+                combined.reset_index(drop=True, inplace=True)
+        self._record_change(entries)
+        # bypass _entries_changed, which would drop the kept paradigms
+        object.__setattr__(self, "entries", combined)
+        return self
+
+    def update_entries(self, changes):
+        """Change values of existing entries, in place. With
+        :attr:`.Pyradigm.incremental`, only the paradigms for the old and new z
+        values of the changed entries are rebuilt by the next composition.
+
+        Args:
+            changes (DataFrame): new values, indexed by the labels of the entries to
+                be changed, with a column for every parameter to be changed. A dict
+                mapping labels to dicts of new values can be passed as well. Missing
+                values leave the entries as they are.
+
+        Returns:
+            the :class:`.Pyradigm` object
+        """
+        if not isinstance(changes, pd.DataFrame):
+            changes = pd.DataFrame.from_dict(changes, orient="index")
+        missing = set(changes.index) - set(self.entries.index)
+        if missing:
+            print(f"Entries not found: {', '.join(map(str, missing))}")
+            sys.exit(1)
+        for col in changes.columns:
+            if col not in self.entries.columns:
+                print(f"'{col}' not found in dataframe columns")
+                sys.exit(1)
+        old = self.entries.loc[changes.index]
+        for col in changes.columns:
+            values = changes[col].dropna()
+            column = self.entries[col]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                new = set(values) - set(column.cat.categories)
+                if new:
+                    categories = sorted(set(column.cat.categories) | new)
+                    self.entries[col] = column.cat.set_categories(categories)
+            self.entries.loc[values.index, col] = values.to_numpy()
+        self._record_change(pd.concat([old, self.entries.loc[changes.index]]))
+        return self
+
+    def compact(self):
+        """Store the entries compactly: parameters as categoricals (integer codes plus
+        a vocabulary of values), the :attr:`.Pyradigm.print_columns` and parameters
+        with mostly unique values (like IDs) as interned strings. Missing values are
+        replaced with empty strings. Compact entries are not copied when composing
+        paradigms.
+
+        Returns:
+            the :class:`.Pyradigm` object
+        """
+        self.entries = _compact_frame(self.entries, self.print_columns)
+        return self
+
+    def share(self):
+        """Publish the entries in shared memory, so worker processes can compose
+        paradigms from them without copies, see :class:`.SharedEntries` and
+        :meth:`.Pyradigm.from_shared`.
+
+        Returns:
+            a :class:`.SharedEntries` object
+        """
+        return SharedEntries.publish(self.entries)
+
+    @classmethod
+    def from_shared(cls, shared, **kwargs):
+        """Create a new Pyradigm from entries in shared memory. Use the ``z_keys``
+        argument of :meth:`.Pyradigm.compose_paradigm` to compose only the paradigms
+        assigned to a worker.
+
+        Args:
+            shared (SharedEntries): entries published with :meth:`.Pyradigm.share`
+
+        Returns:
+            a :class:`.Pyradigm` object
+        """
+        return cls(entries=shared.frame(), **kwargs)
+
+    def label_grammar(self, separators=None, p_values=None):
+        """Get the :class:`.LabelGrammar` used to parse and format axis labels.
+        Grammars are shared between calls, so their ``cache_info()`` reflects all
+        labels processed so far.
+
+        Args:
+            separators (list): defaults to :attr:`.Pyradigm.separators`
+            p_values (list): defaults to :attr:`.Pyradigm.person_values`
+
+        Returns:
+            a :class:`.LabelGrammar` object
+        """
+        if separators is None:
+            separators = self.separators
+        if p_values is None:
+            p_values = self.person_values
+        return get_label_grammar(separators, p_values)
 
     @classmethod
     def from_dataframe(cls, df: pd.DataFrame, data_format="wide", **kwargs):
@@ -131,17 +1645,20 @@ class Pyradigm:
 
         Args:
             df (DataFrame): a pandas dataframe containing the data in wide format
+            compact (bool): store the entries compactly, see
+                :meth:`.Pyradigm.compact`
 
         Returns:
             a :class:`.Pyradigm` object
         """
-
+        compact = kwargs.pop("compact", False)
         if data_format == "wide":
-            return cls(entries=df, **kwargs)
+            pyd = cls(entries=df, **kwargs)
+            return pyd.compact() if compact else pyd
         if data_format == "long":
-            out = df.pivot(index="ID", columns="Parameter", values="Value")
-            out.columns.name = None
-            return cls(entries=out, **kwargs)
+            out = _LongAccumulator().add(df).to_frame()
+            pyd = cls(entries=out, **kwargs)
+            return pyd.compact() if compact else pyd
         if data_format == "paradigm":
             if "x" not in kwargs:
                 print("Specify what values are on the x axis")
@@ -149,12 +1666,16 @@ class Pyradigm:
             if "y" not in kwargs:
                 print("Specify what values are on the y axis")
                 sys.exit()
-            return cls(entries=cls.decompose_paradigm(cls, paradigm=df, **kwargs))
+            return cls(
+                entries=cls().decompose_paradigm(paradigm=df, compact=compact, **kwargs)
+            )
         print(f"Invalid format: {data_format}")
         sys.exit(1)
 
     @classmethod
-    def from_csv(cls, path, data_format="wide", **kwargs):
+    def from_csv(  # pylint: disable=too-many-arguments
+        cls, path, data_format="wide", chunksize=None, cache=None, **kwargs
+    ):
         """Create a new Pyradigm object from a CSV file.
 
         Args:
@@ -164,19 +1685,137 @@ class Pyradigm:
                 * ``"long"``: Columns: ID, Parameter, Value
                 * ``"paradigm"``: Decompose a paradigm by specifying at least x and y\
          (kwargs are passed to :meth:`.Pyradigm.decompose_paradigm`)
+            chunksize (int): read the file in chunks of this many rows. If
+                ``filters`` or ``ignore`` are passed, the file is always read in
+                chunks and only matching rows and columns (``"wide"``) or
+                parameters (``"long"``) are kept. Files in ``"long"`` format are
+                always read in chunks and stored as integer codes until the wide
+                entries are built; duplicate (ID, Parameter) pairs are reported,
+                and only the first value is kept.
+            cache (bool or str): keep the parsed data in a cache, which later calls
+                map into memory instead of parsing the file again, as long as its
+                path, size and modification time are the same. With ``True``, the
+                cache is stored next to the file (``<file>.pyradigms``), otherwise
+                in the given directory. Data read from a cache is categorical.
+            with_multi_index (bool): for ``"paradigm"``, the file has one header
+                row per x parameter and one index column per y parameter, as
+                written for paradigms composed with ``with_multi_index=True``.
 
         Returns:
             a :class:`.Pyradigm` object
         """
-        if data_format in ["wide", "long"]:
-            df = pd.read_csv(path, keep_default_na=False, dtype=str)
-        elif data_format == "paradigm":
-            df = pd.read_csv(path, keep_default_na=False, dtype=str, index_col=0)
-        else:
+        filters = kwargs.get("filters", {})
+        ignore = _listify(kwargs.get("ignore", []))
+        if data_format not in ["wide", "long", "paradigm"]:
             print(f"Invalid format: {data_format}")
             sys.exit(1)
+        if data_format == "wide" and ignore:
+            # filters on ignored columns are applied while reading
+            kwargs["filters"] = {
+                col: kept for col, kept in filters.items() if col not in ignore
+            }
+        axes = None
+        if data_format == "paradigm" and kwargs.pop("with_multi_index", False):
+            axes = [_listify(kwargs.get(axis, [])) for axis in ["x", "y"]]
+        if not cache:
+            df, data_format = _parse_csv(
+                path, data_format, chunksize, filters, ignore, axes
+            )
+            return cls.from_dataframe(df, data_format=data_format, **kwargs)
+
+        cache_dir = _cache_dir(path, cache)
+        key = _cache_key(
+            path,
+            {
+                "data_format": data_format,
+                "filters": filters,
+                "ignore": ignore,
+                "axes": axes,
+            },
+        )
+        df = _read_cache(cache_dir, key)
+        if df is None:
+            log.debug("Writing cache %s", cache_dir)
+            df, data_format = _parse_csv(
+                path, data_format, chunksize, filters, ignore, axes
+            )
+            _write_cache(cache_dir, key, df)
+            df = _read_cache(cache_dir, key)
+        elif data_format == "long":
+            data_format = "wide"
         return cls.from_dataframe(df, data_format=data_format, **kwargs)
 
+    @classmethod
+    def from_parquet(cls, path, data_format="wide", **kwargs):
+        """Create a new Pyradigm object from a Parquet file (requires ``pyarrow``).
+
+        Args:
+            path (str): path to the Parquet file to be read
+            data_format (str): see :meth:`.Pyradigm.from_csv`
+
+        Returns:
+            a :class:`.Pyradigm` object
+        """
+        _require_parquet()
+        return cls.from_dataframe(
+            pd.read_parquet(path), data_format=data_format, **kwargs
+        )
+
+    def to_parquet(self, path, data_format="wide"):
+        """Write the entries to a Parquet file (requires ``pyarrow``).
+
+        Args:
+            path (str): path to the Parquet file to be written
+            data_format (str):
+                * ``"wide"`` (default): Parameters in columns, entries in rows.
+                * ``"long"``: Columns: ID, Parameter, Value
+        """
+        _require_parquet()
+        if data_format == "wide":
+            self.entries.to_parquet(path)
+        elif data_format == "long":
+            self.to_long().to_parquet(path, index=False)
+        else:
+            print(f"Invalid format: {data_format}")
+            sys.exit(1)
+
+    @classmethod
+    def from_paradigm_files(cls, paths, workers=None, compact=False, **kwargs):
+        """Create a new Pyradigm object from paradigms stored in CSV files, one
+        paradigm per file. The z value of every paradigm is the name of its index
+        (the upper left cell), or else the file name without extension.
+
+        Args:
+            paths (str): a glob pattern or a list of paths to CSV files
+            workers (int): decompose the files in parallel, using this many processes
+            compact (bool): store the entries compactly, see
+                :meth:`.Pyradigm.compact`
+            **kwargs: passed to :meth:`.Pyradigm.decompose_paradigm`; ``x``, ``y``
+                and ``z`` (the parameter which holds the z values) are required
+
+        Returns:
+            a :class:`.Pyradigm` object
+        """
+        if "x" not in kwargs:
+            print("Specify what values are on the x axis")
+            sys.exit()
+        if "y" not in kwargs:
+            print("Specify what values are on the y axis")
+            sys.exit()
+        if not kwargs.get("z"):
+            print("Specify the parameter which holds the z values of the files")
+            sys.exit()
+        if isinstance(paths, (str, Path)):
+            paths = sorted(glob.glob(str(paths)))
+        if not paths:
+            print("No paradigm files found")
+            sys.exit(1)
+        frames = list(
+            _imap_parallel(partial(_decompose_file, kwargs=kwargs), paths, workers)
+        )
+        entries = pd.concat(frames, ignore_index=True, copy=False)
+        pyd = cls(entries=entries)
+        return pyd.compact() if compact else pyd
 
     @classmethod
     def from_dict(cls, records):
@@ -208,7 +1847,9 @@ class Pyradigm:
         )
         return cls(df)
 
-    def decompose_paradigm(self, paradigm, z_value=None, **kwargs):  # noqa
+    def decompose_paradigm(  # noqa
+        self, paradigm, z_value=None, compact=False, **kwargs
+    ):
         """Decompose a paradigm by specifying the parameters shown on the x and y axes.
 
         Args:
@@ -220,10 +1861,17 @@ class Pyradigm:
             x (list): The parameters shown on the x axis (columns)
             y (list): The parameters shown on the y axis (index)
             separators (list): Strings by which x and y labels (combined categories)
-                will be split.
+                will be split. Axes with a ``MultiIndex`` (one level per parameter,
+                as composed with ``with_multi_index=True``) and axes named after
+                their only parameter are not split: their levels are mapped to the
+                parameters by name, or else by position.
             print_column (str): Name of the column where paradigm cells will be stored.
+            person_values (list): Values written without a separator before the next
+                value, see :attr:`.Pyradigm.person_values`.
             z_value (str): if a z parameter is specified for the paradigm to be
                 decomposed, you can assign a value manually.
+            compact (bool): store the parameters as categoricals and the forms as
+                interned strings, see :meth:`.Pyradigm.compact`
 
         Returns: a `pandas DataFrame\
         <https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.html>`_ object
@@ -237,32 +1885,49 @@ class Pyradigm:
         separators = kwargs.get("separators", self.separators)
         print_column = kwargs.get("print_column", "Form")
         z_value = z_value or paradigm.index.name
+        grammar = self.label_grammar(separators, kwargs.get("person_values"))
 
         # gather all parameter names from the defined axes
         # + the name of what's in the cells
         if z:
-            entries = pd.DataFrame(columns=z + x + y + [print_column])
+            columns = z + x + y + [print_column]
         else:
-            entries = pd.DataFrame(columns=x + y + [print_column])
-
-        for i, (x_string, col) in enumerate(paradigm.items()):
-            for y_string, form in col.items():
-                x_values = _get_parameter_values(x_string, x, separators)
-                y_values = _get_parameter_values(y_string, y, separators)
-                param_list = x + y  # List of parameter names
-                value_list = x_values + y_values  # List of parameter values
-                if z:
-                    param_list += z
-                    value_list += [z_value]
-                param_list += [print_column]
-                value_list += [form]
-                entries = pd.concat(
-                    [
-                        entries,
-                        pd.DataFrame(dict(zip(param_list, value_list)), index=[i]),
-                    ]
-                )
-
+            columns = x + y + [print_column]
+
+        # parse every distinct label only once, or take the levels of hierarchical axes
+        x_codes, x_values = _axis_parameter_values(paradigm.columns, x, grammar)
+        y_codes, y_values = _axis_parameter_values(paradigm.index, y, grammar)
+
+        # cells in column-major order: one row per (column, row) pair
+        n_rows, n_cols = paradigm.shape
+        cell_x = np.repeat(x_codes, n_rows)
+        cell_y = np.tile(y_codes, n_cols)
+        data = {}
+        for axis_params, axis_values, codes in [
+            (x, x_values, cell_x),
+            (y, y_values, cell_y),
+        ]:
+            for param, values in zip(axis_params, axis_values):
+                if compact:
+                    # one category per distinct label value, taken by cell
+                    values = pd.Categorical(pd.Series(values, dtype=object).fillna(""))
+                    data[param] = values.take(codes)
+                else:
+                    data[param] = values[codes]
+        if z:
+            for param in z:
+                if compact:
+                    data[param] = pd.Categorical.from_codes(
+                        np.zeros(len(cell_x), dtype=np.int8),
+                        categories=[z_value or ""],
+                    )
+                else:
+                    data[param] = np.full(len(cell_x), z_value, dtype=object)
+        forms = paradigm.to_numpy(dtype=object).ravel(order="F")
+        if compact:
+            forms = _intern(*pd.factorize(forms))
+        data[print_column] = forms
+        entries = pd.DataFrame(data, columns=columns)
 
         entries.dropna(subset=[print_column], inplace=True)  # …drop rows with no form
         entries.reset_index(drop=True, inplace=True)  # reset index
@@ -282,7 +1947,7 @@ class Pyradigm:
                 * ``"wide"``: Parameters in columns, entries in rows.
                 * ``"long"``: Columns: ID, Parameter, Value
             pyd_kwargs (dict): Any parameters to be passed to\
-            :meth:`.Pyradigm.compose_paradigm` if ``data_format=="paradigm"``
+            :meth:`.Pyradigm.iter_paradigms` if ``data_format=="paradigm"``
 
         Returns:
             A markdown string.
@@ -292,60 +1957,344 @@ class Pyradigm:
             out = self.to_long()
             return out.to_markdown(index=False, **kwargs)
         if data_format == "paradigm":
-            out = self.compose_paradigm(**pyd_kwargs)
-            if isinstance(out, dict):
-                mds = []
-                for z, x in out.items():
+            mds = []
+            for z, x in self.iter_paradigms(**pyd_kwargs):
+                if z != "z":
                     x.index.name = z
-                    mds.append(x.to_markdown(**kwargs))
-                return "\n\n".join(mds)
+                mds.append(x.to_markdown(**kwargs))
+            return "\n\n".join(mds)
         if data_format == "wide":
             return self.entries.to_markdown(index=False, **kwargs)
         print(f"Unknown format '{data_format}'.")
         sys.exit(1)
 
+    def _long_ids(self):
+        """The IDs of the entries: the ``ID`` column, or else the row label and the
+        printed columns, e.g. ``0-vengo``."""
+        if "ID" in self.entries.columns:
+            return _as_object(self.entries["ID"]).to_numpy(dtype=object)
+        labels = pd.Series(self.entries.index.astype(str), index=self.entries.index)
+        cells = _join_columns(self.entries, self.print_columns, self.print_sep)
+        return (labels + "-" + cells).to_numpy(dtype=object)
+
+    def _long_parameters(self):
+        return [p for p in self._parameters if p != "ID"] + self.print_columns
+
     def to_long(self):
         """Arrange the entries in\
         `long <https://en.wikipedia.org/wiki/Wide_and_narrow_data#Narrow>`_ format.
-        If there is no column ``ID``, one will be created.
+        If there is no column ``ID``, IDs are created from the row labels and the
+        :attr:`.Pyradigm.print_columns`. The entries are not changed.
 
         Returns: a `pandas DataFrame <https://pandas.pydata.org\
 /docs/reference/api/pandas.DataFrame.html>`_ object"""
-        if "ID" not in self.entries.columns:
-            self.entries[  # pylint: disable=unsupported-assignment-operation
-                "ID"
-            ] = self.entries.apply(
-                lambda x: f"{x.name}-{self.print_sep.join([x[col] for col in self.print_columns])}",
-                axis=1,
-            )
-        return pd.melt(
-            self.entries,
-            id_vars="ID",
-            value_vars=self._parameters + self.print_columns,
-            var_name="Parameter",
-            value_name="Value",
+        ids = self._long_ids()
+        parameters = self._long_parameters()
+        n_entries = len(ids)
+        values = [
+            _as_object(self.entries[p]).to_numpy(dtype=object) for p in parameters
+        ]
+        return pd.DataFrame(
+            {
+                "ID": np.tile(ids, len(parameters)),
+                "Parameter": np.repeat(np.array(parameters, dtype=object), n_entries),
+                "Value": (
+                    np.concatenate(values) if values else np.array([], dtype=object)
+                ),
+            }
         )
 
+    def to_long_csv(self, path, chunksize=100000, compression=None):
+        """Write the entries in long format to a CSV file, as :meth:`.Pyradigm.to_long`
+        would produce them, but a few rows at a time.
+
+        Args:
+            path (str): the CSV file to be written
+            chunksize (int): the number of rows written at a time
+            compression (str): ``"gzip"`` or ``"zstd"``
+        """
+        ids = self._long_ids()
+        with _open_output(Path(path), compression) as file:
+            file.write("ID,Parameter,Value\n")
+            for parameter in self._long_parameters():
+                values = self.entries[parameter]
+                for start in range(0, len(ids), chunksize):
+                    pd.DataFrame(
+                        {
+                            "ID": ids[start : start + chunksize],
+                            "Parameter": parameter,
+                            "Value": _as_object(values.iloc[start : start + chunksize]),
+                        }
+                    ).to_csv(file, header=False, index=False)
+
     def _print_cell_string(self, series, category_joiner):
-        return category_joiner.join(series.unique())
+        return _print_cell_string(series, category_joiner)
 
-    def compose_paradigm(  # pylint: disable=too-many-locals
-        # pylint: disable=too-many-branches
-        # pylint: disable=too-many-statements
-        self,
-        csv_output=None,
-        **kwargs,
-    ):
+    def compose_paradigm(self, csv_output=None, **kwargs):
         """The central function of pyradigms, creating paradigms. In addition to the list
         below, **you can pass any
-        argument described for the** :class:`.Pyradigm` **class**.
+        argument described for the** :class:`.Pyradigm` **class** and
+        :meth:`.Pyradigm.iter_paradigms`.
 
         Args:
-            csv_output (str): CSV file to save paradigm to.
+            csv_output (str): CSV file to save paradigm to. Paradigms are written as
+                soon as they are built, separated by empty lines.
 
         Returns:
            If one paradigm is generated, a pandas DataFrame.
            If multiple paradigms are generated, a dict of DataFrames."""
+        constructed_paradigms = {}
+        if csv_output is not None:
+            log.debug("Writing to %s", csv_output)
+        with _open_output(csv_output, kwargs.get("compression")) as file:
+            for z_key, df in self.iter_paradigms(**kwargs):
+                if file is not None:
+                    if constructed_paradigms:
+                        file.write("\n")
+                    df.to_csv(file, index=True, index_label="")
+                constructed_paradigms[z_key] = df
+
+        if len(constructed_paradigms) == 1:
+            return list(constructed_paradigms.values())[0]
+        elif len(constructed_paradigms) == 0:
+            return None
+        return constructed_paradigms
+
+    def compile(self, **kwargs):
+        """Prepare a composition which can be run repeatedly: the parameters are
+        validated and the sort orders completed once, from the entries. Takes the same
+        arguments as :meth:`.Pyradigm.iter_paradigms`.
+
+        Returns:
+            a :class:`.ParadigmPlan` object
+        """
+        options = {name: getattr(self, name) for name in _COMPOSE_ATTRIBUTES}
+        options["output_folder"] = self.output_folder
+        options.update(kwargs)
+        options.pop("input_df", None)
+        axes = {axis: tuple(_listify(options.pop(axis))) for axis in ["x", "y", "z"]}
+        options["print_columns"] = _listify(options["print_columns"])
+        options["ignore"] = _listify(options["ignore"])
+        columns = None if self.entries is None else tuple(self.entries.columns)
+        _check_composition(
+            columns,
+            axes,
+            options["print_columns"],
+            options["ignore"],
+            options.get("engine", "native"),
+            options.get("compression"),
+        )
+        sort_orders = _complete_orders(
+            self.entries,
+            axes["y"] + axes["x"],
+            axes["z"],
+            options.pop("sort_orders"),
+            options["filters"],
+        )
+        return ParadigmPlan(
+            sort_orders=tuple((p, tuple(o)) for p, o in sort_orders.items()),
+            options=_freeze(options),
+            entries=self.entries,
+            columns=columns,
+            **axes,
+        )
+
+    def iter_sharded(  # pylint: disable=too-many-arguments,too-many-locals
+        self, path, shards=16, workers=None, scratch_dir=None, chunksize=None, **kwargs
+    ):
+        """Compose paradigms from a wide format CSV file which is too large to be held
+        in memory. The file is read in chunks, and the entries are distributed by
+        their z value into ``shards`` files in a scratch directory. The shards are
+        then composed independently, so only the entries of one shard (per worker)
+        are in memory at a time. Sort orders are guessed from the whole file while
+        it is distributed. Takes the same arguments as :meth:`.Pyradigm.compile`;
+        use ``output_folder`` to write every paradigm to a file.
+
+        Args:
+            path (str): the CSV file with the entries
+            shards (int): the number of shard files
+            workers (int): compose this many shards in parallel
+            scratch_dir (str): where the (temporary) shard files are stored,
+                defaults to the system's temporary directory
+            chunksize (int): the number of rows read at a time
+
+        Yields:
+            ``(z_key, paradigm)`` tuples, shard by shard; within a shard, in the sort
+            order of the z values
+        """
+        options = {name: getattr(self, name) for name in _COMPOSE_ATTRIBUTES}
+        options["output_folder"] = self.output_folder
+        options.update(kwargs)
+        x, y, z = [_listify(options.pop(axis)) for axis in ["x", "y", "z"]]
+        filters = options["filters"]
+        ignore = _listify(options["ignore"])
+        grammar = self.label_grammar(options["separators"], options["person_values"])
+        values = {parameter: {} for parameter in y + x + z}
+        if not z:
+            shards = 1
+
+        with tempfile.TemporaryDirectory(dir=scratch_dir) as scratch:
+            files = {}
+            try:
+                for chunk in _iter_csv_chunks(
+                    path,
+                    chunksize,
+                    row_filter=partial(
+                        _select_entries, filters=filters, ignore=ignore
+                    ),
+                    usecols=lambda col: col not in ignore or col in filters,
+                ):
+                    remainders = set(values) - set(chunk.columns)
+                    if len(remainders) > 0:
+                        rstring = ", ".join(remainders)
+                        print(f"Axes contain inexistent parameter(s): {rstring}")
+                        sys.exit(1)
+                    for parameter, seen in values.items():
+                        seen.update(dict.fromkeys(pd.unique(chunk[parameter])))
+                    if len(z) > 1:
+                        z_values = _concat_values(
+                            chunk, z, options["separators"][0], grammar.person_values
+                        )
+                    elif z:
+                        z_values = chunk[z[0]]
+                    else:
+                        z_values = pd.Series("z", index=chunk.index)
+                    shard_ids = pd.util.hash_array(z_values.to_numpy(dtype=object))
+                    for shard, rows in chunk.groupby(shard_ids % shards, sort=False):
+                        if shard not in files:
+                            files[shard] = open(  # pylint: disable=consider-using-with
+                                Path(scratch) / f"shard{shard}.csv",
+                                "w",
+                                encoding="utf-8",
+                                newline="",
+                            )
+                            rows.to_csv(files[shard], index=False)
+                        else:
+                            rows.to_csv(files[shard], header=False, index=False)
+            finally:
+                for file in files.values():
+                    file.close()
+
+            options["sort_orders"] = _guess_orders(
+                values, y + x, z, options["sort_orders"], filters
+            )
+            # the shards are filtered already, and have no ignored columns
+            options["filters"] = {
+                col: kept for col, kept in filters.items() if col not in ignore
+            }
+            shard_paths = [file.name for _, file in sorted(files.items())]
+            for paradigms in _imap_parallel(
+                partial(_compose_shard, options=dict(options, x=x, y=y, z=z)),
+                shard_paths,
+                workers,
+            ):
+                yield from paradigms
+
+    async def acompose_paradigm(self, executor=None, **kwargs):
+        """Compose paradigms without blocking the event loop. The paradigms are
+        composed with a plan (see :meth:`.Pyradigm.compile`) in ``executor``.
+        Concurrent calls with the same parameters and entries share one computation.
+
+        Args:
+            executor (Executor): where the paradigms are composed, defaults to the
+                default executor of the event loop. A ``ProcessPoolExecutor`` can be
+                used if the composition parameters can be pickled.
+            **kwargs: passed to :meth:`.Pyradigm.compile`
+
+        Returns:
+           Like :meth:`.Pyradigm.compose_paradigm`. Every caller gets its own copies.
+        """
+        loop = asyncio.get_running_loop()
+        key = (
+            id(loop),
+            id(executor),
+            await loop.run_in_executor(None, self._request_key, kwargs),
+        )
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._acompose(loop, executor, kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return _copy_paradigms(await asyncio.shield(future))
+
+    async def _acompose(self, loop, executor, kwargs):
+        plan = await loop.run_in_executor(None, partial(self.compile, **kwargs))
+        return await loop.run_in_executor(executor, _run_plan, plan)
+
+    async def aiter_paradigms(self, executor=None, **kwargs):
+        """Generate paradigms one at a time without blocking the event loop, see
+        :meth:`.Pyradigm.acompose_paradigm`. ``executor`` has to run threads.
+
+        Yields:
+            ``(z_key, paradigm)`` tuples, as soon as they are built
+        """
+        loop = asyncio.get_running_loop()
+        plan = await loop.run_in_executor(None, partial(self.compile, **kwargs))
+        paradigms = plan.iter_paradigms()
+        while True:
+            item = await loop.run_in_executor(executor, next, paradigms, _END)
+            if item is _END:
+                return
+            yield item
+
+    def iter_paradigms(self, **kwargs):
+        """Generate paradigms one at a time, so they can be processed while the
+        remaining ones are being built. Takes the same arguments as
+        :meth:`.Pyradigm.compose_paradigm`, except for ``csv_output``.
+
+        Args:
+            workers (int): Build the paradigms for different z values in parallel,
+                using this many processes (or threads, if the ``decorate``
+                functions cannot be pickled). With ``output_folder``, every worker
+                writes its own CSV files.
+            engine (str): How cells are laid out on the grid.
+
+                * ``"native"`` (default): Directly from integer codes of the x and y
+                  values.
+                * ``"pivot_table"``: With ``pd.pivot_table``, as in earlier versions.
+                * ``"sparse"``: Like ``"native"``, but only rows and columns with
+                  content are allocated, which saves memory for large, mostly
+                  empty grids. With ``drop_empty=False`` or ``with_multi_index``,
+                  where empty rows and columns are kept, ``"native"`` is used.
+            compression (str): Compress written files with ``"gzip"`` or ``"zstd"``
+                (requires the ``zstandard`` package). Files in ``output_folder`` get
+                a ``.gz`` or ``.zst`` suffix.
+            z_keys (list): Only compose the paradigms for these z values.
+            stats (callable): Called with a :class:`StageStats` record for every
+                stage of the composition, e.g. a :class:`.ComposeStats` object.
+
+        Yields:
+            ``(z_key, paradigm)`` tuples in the sort order of the z values. Without
+            a z axis, a single paradigm is generated, with the key ``"z"``."""
+        pd.set_option("display.max_rows", None, "display.max_columns", None)
+        key = self._result_key(kwargs)
+        if key is None:
+            yield from self._iter_paradigms(**kwargs)
+            return
+        cached = self.result_cache.find(key)
+        if cached is not None:
+            for z_key, paradigm in cached:
+                yield z_key, paradigm.copy()
+            return
+        results = []
+        for z_key, paradigm in self._iter_paradigms(**kwargs):
+            results.append((z_key, paradigm.copy()))
+            yield z_key, paradigm
+        self.result_cache.put(key, results)
+        # guessed orders have been added to the sort orders, so later calls differ
+        self.result_cache.put(self._request_key(kwargs, key[1]), results)
+
+    def _iter_paradigms(  # pylint: disable=too-many-locals
+        # pylint: disable=too-many-branches
+        # pylint: disable=too-many-statements
+        self,
+        validated=False,
+        orders_complete=False,
+        **kwargs,
+    ):
+        """Compose the paradigms. A :class:`.ParadigmPlan` passes ``validated`` if it
+        has checked the parameters against the columns of ``input_df`` already, and
+        ``orders_complete`` if the sort orders cover all values of ``input_df``."""
         input_df = kwargs.get("input_df", self.entries)
         with_multi_index = kwargs.get("with_multi_index", self.with_multi_index)
         x = kwargs.get("x", self.x)
@@ -358,229 +2307,306 @@ class Pyradigm:
         print_columns = _listify(kwargs.get("print_columns", self.print_columns))
         sort_orders = kwargs.get("sort_orders", self.sort_orders)
         output_folder = kwargs.get("output_folder", self.output_folder)
-        decorate_x = kwargs.get("decorate_x", lambda x: x)
-        decorate_y = kwargs.get("decorate_y", lambda y: y)
+        decorate_x = kwargs.get("decorate_x", _identity)
+        decorate_y = kwargs.get("decorate_y", _identity)
         drop_empty = kwargs.get("drop_empty", True)
-        decorate = kwargs.get("decorate", lambda x: x)
+        decorate = kwargs.get("decorate", _identity)
         print_sep = kwargs.get("print_sep", self.print_sep)
+        workers = kwargs.get("workers", None)
+        engine = kwargs.get("engine", "native")
+        compression = kwargs.get("compression", None)
+        stats = kwargs.get("stats", None)
+        selected_z = kwargs.get("z_keys", None)
+        grammar = self.label_grammar(separators, kwargs.get("person_values"))
+        timer = _StageTimer(stats is not None)
         if output_folder:
             output_folder = Path(output_folder)
 
-        df = input_df.copy()
-        df.replace(np.nan, "", inplace=True)
-        log.debug(f"Composing a new paradigm from entries:\n{self._short_repr}")
+        # entries are only copied if there are missing values to be replaced
+        if _has_missing(input_df):
+            df = input_df.copy()
+            df.replace(np.nan, "", inplace=True)
+        else:
+            df = input_df
+        log.debug("Composing a new paradigm from entries:\n%s", self._short_repr)
+
+        # parameter values in order of first appearance, factorized once per call
+        value_index = {}
 
         # get a sensible default sort order for a given parameter (order in the input)
-        def get_sort_order(parameter):
+        def get_sort_order(parameter, positions=None):
             if parameter in filters:
                 return filters[parameter]
-            val_list = list(dict.fromkeys(list(df[parameter])))
-            log.debug(f"New sort order for {parameter}: {val_list}")
+            if parameter not in value_index:
+                value_index[parameter] = pd.factorize(df[parameter])
+            codes, values = value_index[parameter]
+            if positions is not None:
+                values = values.take(pd.unique(codes[positions]))
+            val_list = list(values)
+            log.debug("New sort order for %s: %s", parameter, val_list)
             return val_list
 
         x = _listify(x)
         y = _listify(y)
         z = _listify(z)
 
-        # check if all axes have valid parameters
-        parameters = {"x": x, "y": y, "z": z}
-        for k, v in parameters.items():
-            remainders = set(v) - set(df.columns)
-            if len(remainders) > 0:
-                rstring = ", ".join(remainders)
-                print(f"{k} axis contains inexistent parameter(s): {rstring}")
-                sys.exit(1)
-
-        # make sure that "Form" or whatever other column to print is present
-        for print_col in print_columns:
-            if print_col not in df.columns:
-                print(f"'{print_col}' not found in dataframe columns")
-                sys.exit(1)
-
-        # inform user if there are columns they did not give directions for
-        leftover_columns = (
-            set(df.columns) - set(x + y + z + print_columns) - set(ignore)
-        )
-        if len(leftover_columns) > 0:
-            log.info(
-                "You did not specify what should happen"
-                " to the following columns/fields/parameters: %s",
-                ", ".join(leftover_columns),
+        if not validated:
+            _check_composition(
+                df.columns,
+                {"x": x, "y": y, "z": z},
+                print_columns,
+                ignore,
+                engine,
+                compression,
             )
 
         # only for debugging purposes
-        filter_string = "\n".join(
-            [f"\t{k}: {', '.join(v)}" for k, v in filters.items()]
+        filter_string = _Lazy(
+            lambda: "\n".join([f"\t{k}: {', '.join(v)}" for k, v in filters.items()])
         )
-        log.debug(f"Filtering parameters:\n{filter_string}\n")
+        log.debug("Filtering parameters:\n%s\n", filter_string)
 
         # filter rows by filter arg
         for col, values in filters.items():
             values = _listify(values)
             df = df[df[col].isin(values)]
-        log.debug("Filtered entries:\n%s", self._short_repr)
-
-        # drop irrelevant columns
-        if len(ignore) > 0:
-            log.debug(f"""Ignoring parameters:\n{", ".join(ignore)}""")
-            df.drop(columns=ignore, inplace=True)
-            log.debug("New entries:\n%s", df)
-
-        # join columns for the y axis
-        def concat_values(row, values):
-            out = ""
-            for value in values:
-                out += row[value]
-                if row[value] not in person_values:
-                    out += separators[0]
-            return out.strip(separators[0]).replace(
-                separators[0] + separators[0], separators[0]
-            )
-
-        new_z_id = separators[0].join(z)
-        z_sort = []
-        for z_dim in z:
-            if z_dim in sort_orders:
-                z_sort.append(sort_orders[z_dim])
+        if len(z) > 0:
+            if len(z) > 1:
+                z_values = _concat_values(
+                    df, z, separators[0], grammar.person_values
+                )
             else:
-                z_sort.append(get_sort_order(z_dim))
-        z_sort = list(itertools.product(*z_sort))
-        z_sort = [separators[0].join(x) for x in z_sort]
+                z_values = df[z[0]]
+            # only compose the paradigms for some z values
+            if selected_z is not None:
+                selected = z_values.isin(_listify(selected_z)).to_numpy()
+                df = df[selected]
+                z_values = z_values[selected]
+        log.debug("Filtered entries:\n%s", _Lazy(lambda: _frame_repr(df)))
+        timer.lap("filter", df)
+
+        # irrelevant columns are not carried over into the paradigms
+        if len(ignore) > 0:
+            log.debug("Ignoring parameters:\n%s", _Lazy(lambda: ", ".join(ignore)))
 
-        if len(z) > 1:
-            df[new_z_id] = df.apply(concat_values, values=z, axis=1)
+        # the strings shown in the cells, with the parameters needed to place them
+        cells = _map_unique(_join_columns(df, print_columns, print_sep), decorate)
+        work = df[list(dict.fromkeys(y + x))].assign(pyradigms_cell=cells.to_numpy())
+        timer.lap("cells", work)
 
         if len(z) > 0:
-            z_dict = dict(tuple(df.groupby(new_z_id)))
-            z_dict = dict(sorted(z_dict.items(), key=lambda x: z_sort.index(x[0])))
+            z_sort = []
+            for z_dim in z:
+                if z_dim in sort_orders:
+                    z_sort.append(sort_orders[z_dim])
+                else:
+                    z_sort.append(get_sort_order(z_dim))
+            positions = df.groupby(z_values, sort=False, observed=True).indices
+            z_keys = _sort_z_keys(z_values, [df[z_dim] for z_dim in z], z_sort)
+            z_groups = ((z_key, positions[z_key]) for z_key in z_keys)
+            timer.lap("group", z_values)
         else:
-            z_dict = {"z": df}
-
-        constructed_paradigms = {}
-        pd.set_option("display.max_rows", None, "display.max_columns", None)
-        for z_key, df in z_dict.items():
-            print(
-                f"Creating pivot table for x={x}, y={y}, z={z_key}, cell values: {print_columns}"
-            )
-            if len(df) == 0:
-                continue
-            df["pyradigms_cell"] = df.apply(
-                lambda x: print_sep.join(x[col] for col in print_columns), axis=1
-            )
-            df["pyradigms_cell"] = df["pyradigms_cell"].map(decorate)
-            out = pd.pivot_table(
-                df,
-                values="pyradigms_cell",
-                index=y,
-                columns=x,
-                aggfunc=lambda x: self._print_cell_string(x, category_joiner),
-            )
-            # drop empty rows
-            idx_name = out.index.names
-            out.reset_index(inplace=True)  # use index as column
-            out.replace(
-                "", np.nan, inplace=True
-            )  # replace all empty strings with NaN, so we can…
-            out.dropna(how="all", inplace=True)  # …drop rows with no content whatsoever
-            out.fillna(
-                "", inplace=True
-            )  # then add back the empty strings for exporting
-            out.set_index(idx_name, drop=True, inplace=True)  # then add back the index
-
-            # for those parameters lacking a specified sort order, establish a default
-            for parameter in out.index.names + out.columns.names:
-                df_sort = get_sort_order(parameter)
-                if parameter not in sort_orders:
-                    print(f"Guessing order {df_sort} for parameter {parameter}")
-                    sort_orders[parameter] = df_sort
-                elif set(df_sort) - set(sort_orders[parameter]) != set():
-                    print(
-                        f"Specified order {sort_orders[parameter]} for parameter "
-                        f"'{parameter}' does not cover all values: {set(df_sort) - set(sort_orders[parameter])}."
-                    )
-                    print(f"Guessing order {df_sort} for parameter {parameter}")
-                    sort_orders[parameter] = df_sort
-
-            # sort x and y axis
-            new_indices = []
-            for idx in y:
-                values = out.index.get_level_values(idx)
-                new_indices.append(
-                    pd.CategoricalIndex(
-                        values, categories=sort_orders[idx], ordered=True
-                    )
-                )
-            out.set_index(new_indices, inplace=True)
-            out.sort_index(level=[c for c in sort_orders if c in y], inplace=True)
-
-            new_columns = []
-            for col in x:
-                values = out.columns.get_level_values(col)
-                new_columns.append(
-                    pd.CategoricalIndex(
-                        values, categories=sort_orders[col], ordered=True
-                    )
+            z_groups = iter([("z", None)])
+        if stats is not None:
+            timer.flush(stats)
+
+        # with incremental composition, unchanged paradigms are reused if their
+        # sort orders did not change either
+        kept = dirty = None
+        if self.incremental and "input_df" not in kwargs:
+            composition_key = self._composition_key(kwargs)
+            version = self._version
+            kept, snapshots = {}, {}
+            state = self._compositions.find(composition_key)
+            if state is not None:
+                kept = state["paradigms"]
+                dirty = self._dirty_z_keys(
+                    state["version"], z, separators[0], grammar.person_values
                 )
-            out.columns = new_columns
-            out.sort_index(
-                level=reversed([c for c in sort_orders if c in x]), inplace=True, axis=1
-            )
 
-            if not with_multi_index:
-                log.debug("Flattening multiindices")
-                new_colindex_name = category_joiner.join(x)
-                out.columns = [
-                    decorate_x(
-                        _format_person_values(
-                            separators[0].join(col).strip(), separators[0]
+        # complete sort orders leave no orders to be guessed
+        unordered = [] if orders_complete else y + x
+
+        def resolve_tasks():
+            for z_key, group_positions in z_groups:
+                if group_positions is None:
+                    group = work
+                else:
+                    group = work.iloc[group_positions]
+                log.info(
+                    "Creating pivot table for x=%s, y=%s, z=%s, cell values: %s",
+                    x,
+                    y,
+                    z_key,
+                    print_columns,
+                )
+                if len(group) == 0:
+                    continue
+
+                # for those parameters lacking a specified sort order,
+                # establish a default
+                present = {}
+                for parameter in unordered:
+                    df_sort = get_sort_order(parameter, group_positions)
+                    present[parameter] = set(df_sort)
+                    if parameter not in sort_orders:
+                        log.info(
+                            "Guessing order %s for parameter %s", df_sort, parameter
                         )
-                    )
-                    for col in out.columns.values
-                ]
-                out.columns.name = new_colindex_name
-
-                new_index_name = category_joiner.join(y)
-                out.index = [
-                    decorate_y(
-                        _format_person_values(
-                            separators[0].join(_listify(col)).strip(), separators[0]
+                        sort_orders[parameter] = df_sort
+                    elif set(df_sort) - set(sort_orders[parameter]) != set():
+                        log.info(
+                            "Specified order %s for parameter '%s' does not cover all"
+                            " values: %s.",
+                            sort_orders[parameter],
+                            parameter,
+                            set(df_sort) - set(sort_orders[parameter]),
                         )
-                    )
-                    for col in out.index.values
-                ]
-                out.index.name = new_index_name
-
-                if drop_empty:
-                    out = out[out.apply(lambda x: "".join(x) != "", axis=1)]
-                    dropcols = [col for col in  out.columns if "".join(out[col]) != ""]
-                    out = out[dropcols]
+                        log.info(
+                            "Guessing order %s for parameter %s", df_sort, parameter
+                        )
+                        sort_orders[parameter] = df_sort
+
+                path = None
+                if output_folder:
+                    if z_key == "z":
+                        path = output_folder / "generated_paradigm.csv"
+                    else:
+                        path = output_folder / (z_key + ".csv")
+                    if compression:
+                        suffix = COMPRESSION_SUFFIXES[compression]
+                        path = path.with_name(path.name + suffix)
+                if kept is not None:
+                    # only the order of the values in this group matters
+                    orders = [
+                        (p, [v for v in o if v in present[p]])
+                        for p, o in sort_orders.items()
+                        if p in present
+                    ]
+                    if dirty is not None and z_key not in dirty and z_key in kept:
+                        if kept[z_key][0] == orders:
+                            yield _Done((z_key, kept[z_key][1].copy(), None))
+                            continue
+                    snapshots[z_key] = orders
+                # orders are resolved group by group, so every group gets a snapshot
+                yield (z_key, group, dict(sort_orders), path)
 
+        if output_folder:
+            log.debug("Saving CSV files to %s", output_folder)
+        compose_group = partial(
+            _compose_z_group,
+            x=x,
+            y=y,
+            decorate_x=decorate_x,
+            decorate_y=decorate_y,
+            category_joiner=category_joiner,
+            separators=separators,
+            p_values=grammar.person_values,
+            with_multi_index=with_multi_index,
+            drop_empty=drop_empty,
+            engine=engine,
+            compression=compression,
+            timed=stats is not None,
+        )
+        paradigms = {}
+        for z_key, out, records in _imap_parallel(
+            compose_group, resolve_tasks(), workers
+        ):
+            if records:
+                for record in records:
+                    stats(record)
+            if kept is not None:
+                if z_key in snapshots:
+                    paradigms[z_key] = (snapshots.pop(z_key), out.copy())
+                else:
+                    paradigms[z_key] = kept[z_key]
+            yield z_key, out
+        if kept is None:
+            return
+        self._compositions.put(
+            composition_key, {"version": version, "paradigms": paradigms}
+        )
+        oldest = min(state["version"] for state in self._compositions.values())
+        self._changes = [change for change in self._changes if change[0] > oldest]
+
+
+@define(frozen=True, eq=False)
+class ParadigmPlan:
+    """A composition prepared by :meth:`.Pyradigm.compile`, with validated axes and
+    complete sort orders. Plans cannot be changed, and running them changes neither
+    the plan, the entries nor any global settings, so one plan can be run
+    repeatedly, from several threads at once."""
+
+    x: tuple
+    y: tuple
+    z: tuple
+    sort_orders: tuple
+    """``(parameter, values)`` pairs"""
+    options: tuple
+    """``(name, value)`` pairs of the remaining composition parameters"""
+    entries: pd.DataFrame = None
+    """The entries the plan was compiled from, used if no others are passed."""
+    columns: tuple = None
+    """The columns of the compiled entries, which the parameters were checked
+    against."""
 
-            constructed_paradigms[z_key] = out
+    def iter_paradigms(self, entries=None, workers=None):
+        """Generate paradigms one at a time, like :meth:`.Pyradigm.iter_paradigms`.
 
-        if csv_output is not None:
-            log.debug(f"Writing to {csv_output}")
-            output = []
-            for z_key, df in constructed_paradigms.items():
-                s = StringIO()
-                df.to_csv(s, index=True, index_label="")
-                output.append(s.getvalue())
-            with open(csv_output, "w", encoding="utf-8") as file:
-                file.write("\n".join(output))
+        Args:
+            entries (DataFrame): entries in wide format, defaults to the compiled ones.
+                Values not covered by the plan's sort orders are ordered by first
+                appearance.
+            workers (int): build paradigms for different z values in parallel,
+                overriding the compiled setting
+
+        Yields:
+            ``(z_key, paradigm)`` tuples
+        """
+        options = {
+            name: list(value) if isinstance(value, tuple) else value
+            for name, value in self.options
+        }
+        options["filters"] = {
+            col: list(values) if isinstance(values, tuple) else values
+            for col, values in options["filters"]
+        }
+        if workers is not None:
+            options["workers"] = workers
+        validated = entries is None or tuple(entries.columns) == self.columns
+        if entries is None:
+            # the compiled orders cover all values of the compiled entries
+            entries = self.entries
+            sort_orders = {p: list(o) for p, o in self.sort_orders}
+        else:
+            sort_orders = _complete_orders(
+                entries,
+                self.y + self.x,
+                self.z,
+                dict(self.sort_orders),
+                options["filters"],
+            )
+        # the orders cover all values, so composing will not change them
+        yield from Pyradigm(entries=entries)._iter_paradigms(
+            validated=validated,
+            orders_complete=True,
+            input_df=entries,
+            x=list(self.x),
+            y=list(self.y),
+            z=list(self.z),
+            sort_orders=sort_orders,
+            **options,
+        )
 
-        if output_folder:
-            log.debug(f"Saving CSV files to {output_folder}")
-            for z_key, df in constructed_paradigms.items():
-                if z_key == "z":
-                    filename = "generated_paradigm.csv"
-                    idx_label = ""
-                else:
-                    filename = z_key + ".csv"
-                    idx_label = z_key
-                df.to_csv(output_folder / filename, index=True, index_label=idx_label)
+    def run(self, entries=None, workers=None):
+        """Compose the paradigms, see :meth:`.ParadigmPlan.iter_paradigms`.
 
-        if len(constructed_paradigms) == 1:
-            return list(constructed_paradigms.values())[0]
-        elif len(constructed_paradigms) == 0:
+        Returns:
+           If one paradigm is generated, a pandas DataFrame.
+           If multiple paradigms are generated, a dict of DataFrames."""
+        paradigms = dict(self.iter_paradigms(entries, workers))
+        if len(paradigms) == 1:
+            return list(paradigms.values())[0]
+        if len(paradigms) == 0:
             return None
-        return constructed_paradigms
+        return paradigms
@@ -1,8 +1,19 @@
+import asyncio
+import gzip
 import logging
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import pytest
+import pyradigms
 from pandas.testing import assert_frame_equal
+from pyradigms import ComposeStats
+from pyradigms import LRUCache
 from pyradigms import Pyradigm
+from pyradigms import SharedEntries
+from pyradigms import layout_cache
 
 
 @pytest.fixture
@@ -264,3 +275,495 @@ def test_markdown(caplog):
             pyd.to_markdown(data_format="nonsense")
         assert "Unknown format" in caplog.text
     assert pytest_wrapped_e.type == SystemExit
+
+
+def test_workers(data, tmp_path):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    kwargs = {
+        "x": ["Person", "Number"],
+        "y": ["Tense", "Mood"],
+        "z": "Lexeme",
+        "ignore": "ID",
+        "sort_orders": {"Number": ["SG", "PL"], "Person": ["1", "2", "3"]},
+    }
+    serial = Pyradigm.from_dataframe(entries, **kwargs).compose_paradigm()
+    parallel = Pyradigm.from_dataframe(entries, **kwargs).compose_paradigm(
+        workers=2, output_folder=tmp_path
+    )
+    assert list(serial) == list(parallel)
+    for z_key, paradigm in serial.items():
+        assert_frame_equal(paradigm, parallel[z_key])
+        assert (tmp_path / f"{z_key}.csv").is_file()
+
+    # unpicklable functions are run in threads
+    threaded = Pyradigm.from_dataframe(entries, **kwargs).compose_paradigm(
+        workers=2, decorate=lambda x: x.upper()
+    )
+    assert threaded["andare"].loc["PRS.IND", "1SG"] == "VADO"
+
+
+def test_iter_paradigms(data, tmp_path):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    pyd = Pyradigm.from_dataframe(
+        entries,
+        x=["Person", "Number"],
+        y=["Tense", "Mood"],
+        z="Lexeme",
+        ignore="ID",
+        sort_orders={"Lexeme": ["andare", "venire"]},
+    )
+    paradigms = pyd.iter_paradigms(output_folder=tmp_path)
+    z_key, paradigm = next(paradigms)
+    assert z_key == "andare"
+    assert (tmp_path / "andare.csv").is_file()
+    assert not (tmp_path / "venire.csv").is_file()
+    assert [z_key for z_key, _ in paradigms] == ["venire"]
+    assert_frame_equal(paradigm, pyd.compose_paradigm()["andare"])
+
+    pyd = Pyradigm(df, x=["Case"], y=["Number"], filters={"Lexeme": ["aestus"]})
+    assert "| PL       | ajstuːs | ajstuum | ajstibus |" in pyd.to_markdown()
+
+
+def test_engines():
+    pyd = Pyradigm(df, y=["Case"], x=["Number"])
+    native = pyd.compose_paradigm(category_joiner=" A/A ")
+    pivot = pyd.compose_paradigm(category_joiner=" A/A ", engine="pivot_table")
+    assert_frame_equal(native, pivot)
+
+    with pytest.raises(SystemExit):
+        pyd.compose_paradigm(engine="nonsense")
+
+
+def test_sparse_engine():
+    entries = df.copy()
+    entries.loc[entries["Case"] == "VOC", "Form"] = ""
+    entries.loc[entries["Lexeme"] == "uxor", "Form"] = ""
+    pyd = Pyradigm(entries, x=["Number"], y=["Case"], z=["Lexeme"])
+    native = pyd.compose_paradigm(category_joiner=" A/A ")
+    sparse = pyd.compose_paradigm(category_joiner=" A/A ", engine="sparse")
+    assert list(native) == list(sparse)
+    for lexeme, table in native.items():
+        assert_frame_equal(table, sparse[lexeme])
+    assert "VOC" not in sparse["aqua"].index
+    assert sparse["uxor"].empty
+
+    for kwargs in [{"drop_empty": False}, {"with_multi_index": True}]:
+        native = pyd.compose_paradigm(**kwargs)
+        sparse = pyd.compose_paradigm(engine="sparse", **kwargs)
+        for lexeme, table in native.items():
+            assert_frame_equal(table, sparse[lexeme])
+
+
+def test_decorate_unique():
+    calls = []
+
+    def decorate(form):
+        calls.append(form)
+        return f"*{form}*"
+
+    pyd = Pyradigm(df, x=["Case"], y=["Number"], z=["Lexeme"])
+    tables = pyd.compose_paradigm(decorate=decorate)
+    assert tables["aqua"].loc["SG", "GEN"] == "*akwaj*"
+    assert len(calls) == len(set(calls)) == df["Form"].nunique()
+
+
+def test_z_sort(data):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    pyd = Pyradigm.from_dataframe(
+        entries,
+        x="Mood",
+        y="Tense",
+        z=["Lexeme", "Number", "Person"],
+        ignore="ID",
+        sort_orders={"Lexeme": ["venire", "andare"], "Number": ["SG", "PL"]},
+    )
+    paras = pyd.compose_paradigm()
+    assert list(paras)[:4] == [
+        "venire.SG.1",
+        "venire.SG.2",
+        "venire.SG.3",
+        "venire.PL.1",
+    ]
+    assert list(paras)[-1] == "andare.PL.3"
+    assert list(pyd.compose_paradigm(z=["Person", "Number"])) == [
+        "1SG",
+        "1PL",
+        "2SG",
+        "2PL",
+        "3SG",
+        "3PL",
+    ]
+
+
+def test_layout_cache(data):
+    layout_cache.cache_clear()
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    pyd = Pyradigm.from_dataframe(
+        entries, x=["Person", "Number"], y=["Tense", "Mood"], z="Lexeme", ignore="ID"
+    )
+    paradigms = pyd.compose_paradigm()
+    info = layout_cache.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+    paradigms["venire"].index.name = "venire"
+    assert pyd.compose_paradigm()["venire"].index.name == "Tense / Mood"
+
+
+def test_compact(data):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    kwargs = {
+        "x": ["Person", "Number"],
+        "y": ["Tense", "Mood"],
+        "z": "Lexeme",
+        "ignore": "ID",
+        "sort_orders": {"Number": ["SG", "PL"], "Person": ["1", "2", "3"]},
+    }
+    pyd = Pyradigm.from_dataframe(entries, compact=True, **kwargs)
+    assert isinstance(pyd.entries["Mood"].dtype, pd.CategoricalDtype)
+    assert pyd.entries["Form"].dtype == object
+    compact = pyd.compose_paradigm(filters={"Mood": ["IND"]})
+    regular = Pyradigm.from_dataframe(entries, **kwargs).compose_paradigm(
+        filters={"Mood": ["IND"]}
+    )
+    for z_key, paradigm in regular.items():
+        assert_frame_equal(paradigm, compact[z_key])
+
+
+def test_csv_pushdown(data):
+    path = data / "italian_entries.csv"
+    kwargs = {
+        "x": ["Person", "Number"],
+        "y": ["Tense", "Mood"],
+        "z": "Lexeme",
+        "filters": {"Lexeme": ["venire"], "Mood": ["IND"]},
+        "ignore": ["ID"],
+    }
+    pyd = Pyradigm.from_csv(path, chunksize=5, **kwargs)
+    assert "ID" not in pyd.entries.columns
+    assert set(pyd.entries["Lexeme"]) == {"venire"}
+    full = Pyradigm.from_csv(path)
+    entries = full.entries
+    assert_frame_equal(
+        entries[(entries["Lexeme"] == "venire") & (entries["Mood"] == "IND")].drop(
+            columns="ID"
+        ),
+        pyd.entries,
+    )
+    assert_frame_equal(full.compose_paradigm(**kwargs), pyd.compose_paradigm())
+
+    # ignored columns can be filtered on
+    kwargs["filters"] = {"ID": list(entries["ID"][::3])}
+    pyd = Pyradigm.from_csv(path, chunksize=5, **kwargs)
+    assert "ID" not in pyd.entries.columns
+    expected = full.compose_paradigm(**kwargs)
+    for z_key, paradigm in pyd.compose_paradigm().items():
+        assert_frame_equal(expected[z_key], paradigm)
+    sharded = dict(Pyradigm().iter_sharded(path, shards=2, **kwargs))
+    for z_key, paradigm in sharded.items():
+        assert_frame_equal(expected[z_key], paradigm)
+
+    long = Pyradigm.from_csv(
+        data / "venire/long.csv", data_format="long", ignore="Mood", chunksize=10
+    )
+    assert "Mood" not in long.entries.columns
+
+
+def test_compressed_output(data, tmp_path):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    pyd = Pyradigm.from_dataframe(
+        entries, x=["Person", "Number"], y=["Tense", "Mood"], z="Lexeme", ignore="ID"
+    )
+    pyd.compose_paradigm(csv_output=tmp_path / "output.csv")
+    pyd.compose_paradigm(
+        csv_output=tmp_path / "output.csv.gz",
+        output_folder=tmp_path,
+        compression="gzip",
+    )
+    with gzip.open(tmp_path / "output.csv.gz", "rt", encoding="utf-8") as f:
+        assert f.read() == (tmp_path / "output.csv").read_text(encoding="utf-8")
+    assert (tmp_path / "venire.csv.gz").is_file()
+
+    with pytest.raises(SystemExit):
+        pyd.compose_paradigm(output_folder=tmp_path, compression="rar")
+
+
+def test_result_cache(data):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    pyd = Pyradigm.from_dataframe(
+        entries,
+        x=["Person", "Number"],
+        y=["Tense", "Mood"],
+        z="Lexeme",
+        ignore="ID",
+        sort_orders={
+            "Number": ["SG", "PL"],
+            "Person": ["1", "2", "3"],
+            "Tense": ["PRS", "IMPF"],
+            "Mood": ["IND", "SBJV"],
+        },
+        result_cache=LRUCache(maxsize=4),
+    )
+    first = pyd.compose_paradigm()
+    first["venire"].iloc[0, 0] = "changed"
+    second = pyd.compose_paradigm()
+    assert pyd.result_cache.cache_info().hits == 1
+    assert second["venire"].iloc[0, 0] == "vengo"
+    pyd.to_markdown()
+    assert pyd.result_cache.cache_info().hits == 2
+
+    pyd.compose_paradigm(filters={"Mood": ["IND"]})
+    assert pyd.result_cache.cache_info().misses == 2
+
+    pyd.entries.loc[0, "Form"] = "vegno"
+    assert pyd.compose_paradigm()["venire"].iloc[0, 0] == "vegno"
+
+    pyd.entries = entries
+    assert pyd.result_cache.cache_info().currsize == 0
+
+    # guessed orders and the order of filters do not matter
+    pyd = Pyradigm(
+        entries, x="Person", y="Tense", z="Lexeme", result_cache=LRUCache(maxsize=4)
+    )
+    pyd.compose_paradigm(filters={"Mood": ["IND"], "Number": ["SG"]})
+    pyd.compose_paradigm(filters={"Number": ["SG"], "Mood": ["IND"]})
+    assert pyd.result_cache.cache_info().hits == 1
+
+
+def test_incremental(data, tmp_path):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    pyd = Pyradigm.from_dataframe(
+        entries,
+        x=["Person", "Number"],
+        y=["Tense", "Mood"],
+        z="Lexeme",
+        ignore="ID",
+        incremental=True,
+    )
+    pyd.compose_paradigm(output_folder=tmp_path)
+    andare = (tmp_path / "andare.csv").stat().st_mtime_ns
+    (tmp_path / "venire.csv").unlink()
+
+    pyd.add_entries(
+        [
+            {
+                "ID": "venire-SG-1-IND-FUT",
+                "Form": "verrò",
+                "Number": "SG",
+                "Person": "1",
+                "Mood": "IND",
+                "Tense": "FUT",
+                "Lexeme": "venire",
+            }
+        ]
+    )
+    res = pyd.compose_paradigm(output_folder=tmp_path)
+    assert (tmp_path / "venire.csv").is_file()
+    assert (tmp_path / "andare.csv").stat().st_mtime_ns == andare
+    assert res["venire"].loc["FUT.IND", "1SG"] == "verrò"
+
+    pyd.update_entries({0: {"Form": "vegno"}})
+    res = pyd.compose_paradigm(output_folder=tmp_path)
+    assert res["venire"].iloc[0, 0] == "vegno"
+    assert (tmp_path / "andare.csv").stat().st_mtime_ns == andare
+    full = Pyradigm(
+        entries=pyd.entries, x=["Person", "Number"], y=["Tense", "Mood"], z="Lexeme"
+    ).compose_paradigm()
+    for z_key, paradigm in full.items():
+        assert paradigm.equals(res[z_key])
+
+    # only the given values are changed
+    pyd.update_entries({0: {"Form": "vengo"}, 1: {"Lexeme": "andare"}})
+    assert pyd.entries.loc[0, "Lexeme"] == "venire"
+    assert pyd.entries.loc[1, "Form"] == entries.loc[1, "Form"]
+    res = pyd.compose_paradigm()
+    assert res["venire"].iloc[0, 0] == "vengo"
+    assert res["andare"].iloc[0, 1] == "vieni / vai"
+
+    for joiner in "abcdefghij":
+        pyd.compose_paradigm(category_joiner=joiner)
+    assert pyd._compositions.cache_info().currsize == 8
+    assert "compositions" not in repr(pyd)
+
+    # filtered entries keep the labels of the file, new entries get fresh ones
+    pyd = Pyradigm.from_csv(
+        data / "italian_entries.csv", filters={"Lexeme": ["venire"]}
+    )
+    pyd.add_entries([{"Lexeme": "venire", "Form": "verrò"}])
+    assert pyd.entries.index.is_unique
+    pyd.update_entries({0: {"Form": "vegno"}})
+    assert (pyd.entries["Form"] == "vegno").sum() == 1
+    with pytest.raises(SystemExit):
+        pyd.add_entries(pyd.entries.tail(1))
+
+    pyd.compact().add_entries([{"Lexeme": "essere", "Form": "sono"}])
+    assert list(pyd.entries["Lexeme"].cat.categories) == ["essere", "venire"]
+    assert pyd.entries["Tense"].iloc[-1] == ""
+
+
+def test_stats(data, caplog, tmp_path):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    pyd = Pyradigm(entries, x=["Person", "Number"], y=["Tense", "Mood"], z="Lexeme")
+    stats = ComposeStats()
+    with caplog.at_level(logging.INFO):
+        pyd.compose_paradigm(stats=stats, output_folder=tmp_path, ignore="ID")
+    assert "Creating pivot table" in caplog.text
+    frame = stats.to_frame()
+    assert list(frame[frame["z_key"] == "andare"]["stage"]) == [
+        "pivot",
+        "layout",
+        "drop_empty",
+        "write",
+    ]
+    summary = stats.summary()
+    assert summary.loc["filter", "rows"] == 48
+    assert summary.loc["pivot", "count"] == 2
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger="pyradigms"):
+        pyd.compose_paradigm(ignore="ID")
+    assert "Creating pivot table" not in caplog.text
+
+
+def test_plan(data, monkeypatch, caplog):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    pyd = Pyradigm(
+        entries,
+        x=["Person", "Number"],
+        y=["Tense", "Mood"],
+        z="Lexeme",
+        ignore=["ID"],
+        sort_orders={"Number": ["PL", "SG"]},
+    )
+    max_rows = pd.get_option("display.max_rows")
+    plan = pyd.compile()
+    complete_orders = pyradigms._complete_orders
+    # the compiled orders are used as they are
+    monkeypatch.setattr(pyradigms, "_complete_orders", None)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: plan.run(), range(4)))
+    assert pyd.sort_orders == {"Number": ["PL", "SG"]}
+    assert pd.get_option("display.max_rows") == max_rows
+    expected = pyd.compose_paradigm()
+    for result in results:
+        for z_key, paradigm in expected.items():
+            assert paradigm.equals(result[z_key])
+
+    monkeypatch.setattr(pyradigms, "_complete_orders", complete_orders)
+    venire = plan.run(entries[entries["Lexeme"] == "venire"])
+    assert venire.equals(expected["venire"])
+
+    # later changes to the object do not reach the plan
+    pyd.filters["Mood"] = ["IND"]
+    pyd.ignore.remove("ID")
+    for z_key, paradigm in plan.run().items():
+        assert paradigm.equals(expected[z_key])
+
+    # parameters are checked when compiling, not on every run
+    pyd = Pyradigm(entries, x=["Person", "Number"], y=["Tense", "Mood"], z="Lexeme")
+    with caplog.at_level(logging.INFO):
+        plan = pyd.compile()
+    assert "You did not specify" in caplog.text
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        plan.run()
+        plan.run(entries)
+    assert "You did not specify" not in caplog.text
+    assert "Guessing order" not in caplog.text
+
+
+def test_async(data):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    pyd = Pyradigm(
+        entries, x=["Person", "Number"], y=["Tense", "Mood"], z="Lexeme", ignore="ID"
+    )
+    expected = pyd.compile().run()
+
+    async def compose():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = await asyncio.gather(
+                *[pyd.acompose_paradigm(executor=executor) for _ in range(4)]
+            )
+            streamed = [item async for item in pyd.aiter_paradigms(executor=executor)]
+        return results, streamed
+
+    results, streamed = asyncio.run(compose())
+    assert results[0]["venire"] is not results[1]["venire"]
+    for result in results:
+        assert result["venire"].equals(expected["venire"])
+    assert [z_key for z_key, _ in streamed] == ["venire", "andare"]
+    assert not pyd._inflight  # pylint: disable=protected-access
+
+
+def test_sharded(data, tmp_path):
+    pyd = Pyradigm(
+        x=["Person", "Number"], y=["Tense", "Mood"], z="Lexeme", ignore="ID"
+    )
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    output = tmp_path / "output"
+    output.mkdir()
+    paradigms = dict(
+        pyd.iter_sharded(
+            data / "italian_entries.csv",
+            shards=4,
+            workers=2,
+            scratch_dir=scratch,
+            chunksize=10,
+            output_folder=output,
+        )
+    )
+    assert not list(scratch.iterdir())
+    assert sorted(p.name for p in output.iterdir()) == ["andare.csv", "venire.csv"]
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    expected = Pyradigm(
+        entries, x=["Person", "Number"], y=["Tense", "Mood"], z="Lexeme", ignore="ID"
+    ).compile().run()
+    for z_key, paradigm in expected.items():
+        assert paradigm.equals(paradigms[z_key])
+
+
+def compose_shared(shared, z_keys):
+    pyd = Pyradigm.from_shared(
+        shared, x=["Person", "Number"], y=["Tense", "Mood"], z="Lexeme", ignore="ID"
+    )
+    return pyd.compose_paradigm(z_keys=z_keys)
+
+
+def test_shared(data):
+    entries = pd.read_csv(data / "italian_entries.csv", dtype=str)
+    pyd = Pyradigm(
+        entries, x=["Person", "Number"], y=["Tense", "Mood"], z="Lexeme", ignore="ID"
+    )
+    expected = pyd.compose_paradigm()
+    with pyd.share() as shared:
+        assert len(pickle.dumps(shared)) < len(pickle.dumps(entries))
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(
+                executor.map(compose_shared, [shared, shared], ["venire", "andare"])
+            )
+        name = shared.name
+    assert results[0].equals(expected["venire"])
+    assert results[1].equals(expected["andare"])
+    with pytest.raises(FileNotFoundError):
+        SharedEntries(name, [], [], [], [], 0).frame()
+
+
+def test_csv_cache(data, tmp_path, monkeypatch):
+    source = tmp_path / "entries.csv"
+    source.write_bytes((data / "italian_entries.csv").read_bytes())
+    entries = Pyradigm.from_csv(source).entries
+    cached = Pyradigm.from_csv(source, cache=True).entries
+    assert (tmp_path / "entries.csv.pyradigms" / "meta.json").is_file()
+
+    def parse(*args):
+        raise AssertionError("cache not used")
+
+    monkeypatch.setattr(pyradigms, "_parse_csv", parse)
+    mapped = Pyradigm.from_csv(source, cache=True).entries
+    assert_frame_equal(mapped, cached)
+    assert_frame_equal(mapped.astype(object), entries)
+    with pytest.raises(AssertionError):
+        Pyradigm.from_csv(source, cache=True, ignore="ID")
+    os.utime(source, ns=(0, 0))
+    with pytest.raises(AssertionError):
+        Pyradigm.from_csv(source, cache=True)
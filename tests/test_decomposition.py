@@ -2,6 +2,7 @@ import logging
 import pandas as pd
 import pytest
 from pandas.testing import assert_frame_equal
+from pyradigms import LabelGrammar
 from pyradigms import Pyradigm
 
 
@@ -47,3 +48,61 @@ def test_too_few_params(caplog, data):
             )
         assert "More values than specified" in caplog.text
     assert pytest_wrapped_e.type == SystemExit
+
+
+def test_label_grammar():
+    grammar = LabelGrammar(separators=[".", "-"], person_values=["1", "2", "3", "1+2"])
+    assert grammar.tokenize("1+2SG") == ("1+2", "SG")
+    assert grammar.tokenize("PRS-IND") == ("PRS", "IND")
+    assert grammar.parameter_values("3PL", ["Person", "Number", "Gender"]) == [
+        "3",
+        "PL",
+        None,
+    ]
+    assert grammar.format_label("1+2.SG") == "1+2SG"
+    grammar.tokenize("1+2SG")
+    info = grammar.cache_info()
+    assert info.hits == 1
+    assert info.misses == 4
+
+    grammar = LabelGrammar(person_values=["A"])
+    assert grammar.tokenize("1SG") == ("1SG",)
+    assert grammar.tokenize("ASG") == ("A", "SG")
+
+
+def test_grammar_reuse(data):
+    pyd = Pyradigm()
+    pyd.label_grammar().cache_clear()
+    df = pd.read_csv(data / "venire/paradigm.csv", index_col=0, dtype=str)
+    pyd.decompose_paradigm(df, x=["Person", "Number"], y=["Tense", "Mood"])
+    pyd.decompose_paradigm(df, x=["Person", "Number"], y=["Tense", "Mood"])
+    info = pyd.label_grammar().cache_info()
+    assert info.misses == 10
+    assert info.hits == 10
+
+
+def test_paradigm_files(data):
+    pyd = Pyradigm.from_paradigm_files(
+        [data / "usurpo.csv", data / "abalieno.csv", data / "venire/paradigm.csv"],
+        x=["Person", "Number"],
+        y=["Mood", "Tense", "Voice"],
+        z="Lexeme",
+        workers=2,
+    )
+    assert list(pd.unique(pyd.entries["Lexeme"])) == ["usurpo", "abalieno", "venire"]
+    assert list(pyd.entries.index) == list(range(len(pyd.entries)))
+
+    pyd = Pyradigm.from_paradigm_files(
+        str(data / "venire" / "paradigm*.csv"),
+        x=["Person", "Number"],
+        y=["Tense", "Mood"],
+        z="Lexeme",
+    )
+    assert len(pyd.entries) == 24
+
+    with pytest.raises(SystemExit):
+        Pyradigm.from_paradigm_files(
+            str(data / "venire" / "paradigm*.csv"),
+            x=["Person", "Number"],
+            y=["Tense", "Mood"],
+        )
@@ -1,4 +1,6 @@
+import logging
 import pandas as pd
+import pytest
 from pandas.testing import assert_frame_equal
 from pyradigms import Pyradigm
 
@@ -63,3 +65,101 @@ def test_roundtrip(data):
     long_df = sort_long(long_df)
 
     assert_frame_equal(gen_long, long_df)
+
+
+def test_long(data, tmp_path):
+    entries = pd.read_csv(data / "venire/entries.csv", dtype=str)
+    pyd = Pyradigm(entries)
+    long_df = pyd.to_long()
+    assert "ID" not in pyd.entries.columns
+    assert_frame_equal(
+        sort_long(long_df), sort_long(pd.read_csv(data / "venire/long.csv", dtype=str))
+    )
+
+    pyd.to_long_csv(tmp_path / "long.csv", chunksize=5)
+    assert (tmp_path / "long.csv").read_text(encoding="utf-8") == long_df.to_csv(
+        index=False
+    )
+
+
+def test_long_ingest(data, caplog, tmp_path):
+    entries = Pyradigm.from_dataframe(
+        pd.read_csv(data / "venire/long.csv", dtype=str), data_format="long"
+    ).entries
+    chunked = Pyradigm.from_csv(
+        data / "venire/long.csv", data_format="long", chunksize=10
+    ).entries
+    assert_frame_equal(entries, chunked)
+
+    long_df = pd.read_csv(data / "venire/long.csv", dtype=str)
+    duplicates = long_df.head(2).assign(Value="PL")
+    with caplog.at_level(logging.WARNING):
+        pyd = Pyradigm.from_dataframe(
+            pd.concat([long_df, duplicates]), data_format="long"
+        )
+    assert "conflicting values: 2" in caplog.text
+    assert_frame_equal(pyd.entries, entries)
+
+    incomplete = pd.DataFrame(
+        {
+            "ID": ["a", "a", None, "b"],
+            "Parameter": ["P", "Form", "P", None],
+            "Value": ["x", "f", "y", "z"],
+        }
+    )
+    with caplog.at_level(logging.WARNING):
+        pyd = Pyradigm.from_dataframe(incomplete, data_format="long")
+    assert "without ID or Parameter: 2" in caplog.text
+    assert pyd.entries.loc["a", "P"] == "x"
+    assert list(pyd.entries.index) == ["a"]
+
+    caplog.clear()
+    incomplete.to_csv(tmp_path / "long.csv", index=False)
+    with caplog.at_level(logging.WARNING):
+        pyd = Pyradigm.from_csv(tmp_path / "long.csv", data_format="long")
+    assert "without ID or Parameter: 2" in caplog.text
+    assert list(pyd.entries.index) == ["a"]
+    assert list(pyd.entries.columns) == ["Form", "P"]
+
+
+@pytest.mark.parametrize("x", [["Person", "Number"], ["Number"]])
+def test_multi_index(data, tmp_path, x):
+    entries = pd.read_csv(data / "venire/entries.csv", dtype=str)
+    # values containing separators are kept as they are
+    entries["Mood"] = entries["Mood"].replace("SBJV", "SBJV.PRS")
+    y = [p for p in ["Tense", "Mood", "Person"] if p not in x]
+    paradigm = Pyradigm(entries).compose_paradigm(
+        x=x, y=y, z="Lexeme", with_multi_index=True
+    )
+    decomposed = Pyradigm().decompose_paradigm(
+        paradigm, x=x, y=y, z="Lexeme", z_value="venire"
+    )
+    assert_frame_equal(sort_entries(decomposed), sort_entries(entries))
+
+    paradigm.to_csv(tmp_path / "paradigm.csv")
+    pyd = Pyradigm.from_csv(
+        tmp_path / "paradigm.csv",
+        data_format="paradigm",
+        with_multi_index=True,
+        x=x,
+        y=y,
+        z="Lexeme",
+        z_value="venire",
+    )
+    assert_frame_equal(sort_entries(pyd.entries), sort_entries(entries))
+
+
+def test_parquet(data, tmp_path):
+    pytest.importorskip("pyarrow")
+    entries = pd.read_csv(data / "venire/entries.csv", dtype=str)
+    pyd = Pyradigm(entries)
+    pyd.to_parquet(tmp_path / "wide.parquet")
+    pyd.to_parquet(tmp_path / "long.parquet", data_format="long")
+    assert_frame_equal(
+        Pyradigm.from_parquet(tmp_path / "wide.parquet").entries, entries
+    )
+    from_long = Pyradigm.from_parquet(tmp_path / "long.parquet", data_format="long")
+    assert_frame_equal(
+        from_long.entries,
+        Pyradigm.from_dataframe(pyd.to_long(), data_format="long").entries,
+    )